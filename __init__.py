@@ -25,23 +25,35 @@ Uso principale:
 __version__ = "1.0.0"
 __author__ = "Advanced Image Registration Module"
 
-# Import principali per compatibilità
-from .core.image_registration import ImageRegistration
-from .utils.utils import find_image_groups, create_output_filename
-
-# Import GUI (opzionale)
-try:
-    from .gui.main_window import launch_gui
-    __all__ = [
-        'ImageRegistration',
-        'find_image_groups',
-        'create_output_filename',
-        'launch_gui'
-    ]
-except ImportError:
-    # GUI non disponibile se tkinter non è installato
-    __all__ = [
-        'ImageRegistration',
-        'find_image_groups',
-        'create_output_filename'
-    ]
+import importlib
+import importlib.util
+
+# Import principali per compatibilità, risolti al primo accesso: importare il
+# pacchetto (ad es. per avviare la GUI) non carica OpenCV e scikit-image
+_LAZY_IMPORTS = {
+    'ImageRegistration': '.core.image_registration',
+    'find_image_groups': '.utils.utils',
+    'create_output_filename': '.utils.utils',
+    'launch_gui': '.gui',
+}
+
+__all__ = [
+    'ImageRegistration',
+    'find_image_groups',
+    'create_output_filename'
+]
+
+# GUI disponibile solo se Tk è installato: si cerca l'estensione C _tkinter,
+# perché il pacchetto tkinter della libreria standard esiste anche senza Tk
+if importlib.util.find_spec("_tkinter") is not None:
+    __all__.append('launch_gui')
+
+
+def __getattr__(name):
+    """Importa i componenti al primo accesso (PEP 562)"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -9,10 +9,26 @@ Componenti:
 - MetadataManager: Gestione metadati geospaziali
 """
 
-from .image_registration import ImageRegistration
-from .metadata_utils import MetadataManager
+import importlib
+
+# Componenti importati al primo accesso: OpenCV, scikit-image e rasterio
+# vengono caricati solo quando servono
+_LAZY_IMPORTS = {
+    'ImageRegistration': '.image_registration',
+    'MetadataManager': '.metadata_utils',
+}
 
 __all__ = [
     'ImageRegistration',
     'MetadataManager'
 ]
+
+
+def __getattr__(name):
+    """Importa i componenti al primo accesso (PEP 562)"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
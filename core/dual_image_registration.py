@@ -16,8 +16,9 @@ from skimage.exposure import match_histograms, equalize_adapthist
 from typing import Tuple, Optional, Dict, Any
 import logging
 import os
-from PIL import Image
-import matplotlib.pyplot as plt
+import json
+from PIL import Image, PngImagePlugin
+from matplotlib import colormaps
 
 
 class DualImageRegistration:
@@ -369,17 +370,27 @@ class DualImageRegistration:
             self.logger.error(f"Errore nella registrazione: {e}")
             raise
     
+    @staticmethod
+    def _overlay_buffer(out: Optional[np.ndarray], shape: Tuple[int, ...],
+                        dtype: np.dtype) -> np.ndarray:
+        """Restituisce out se compatibile (forma e dtype), altrimenti un nuovo array"""
+        if out is not None and out.shape == shape and out.dtype == dtype:
+            return out
+        return np.empty(shape, dtype=dtype)
+    
     def create_overlay_visualization(self, registration_result: Dict[str, Any], 
-                                   overlay_mode: str = 'blend') -> np.ndarray:
+                                   overlay_mode: str = 'blend',
+                                   out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Crea visualizzazione sovrapposta delle immagini registrate
         
         Args:
             registration_result: Risultato della registrazione
             overlay_mode: 'blend', 'checkerboard', 'side_by_side', 'thermal_overlay'
+            out: Array opzionale da riutilizzare come output (se forma e dtype coincidono)
             
         Returns:
-            Immagine di visualizzazione
+            Immagine di visualizzazione (out stesso se riutilizzato)
         """
         ref_img = registration_result['reference_image']
         reg_target = registration_result['registered_target']
@@ -388,12 +399,14 @@ class DualImageRegistration:
         if overlay_mode == 'blend':
             # Blend semplice 50/50 nella regione di overlap
             alpha = 0.5
-            result = ref_img.copy()
+            result = self._overlay_buffer(out, ref_img.shape, ref_img.dtype)
+            np.copyto(result, ref_img)
             result[mask] = alpha * ref_img[mask] + (1 - alpha) * reg_target[mask]
             
         elif overlay_mode == 'checkerboard':
             # Pattern a scacchiera
-            result = ref_img.copy()
+            result = self._overlay_buffer(out, ref_img.shape, ref_img.dtype)
+            np.copyto(result, ref_img)
             h, w = result.shape
             checker = np.zeros((h, w), dtype=bool)
             checker[::20, ::20] = True
@@ -404,10 +417,12 @@ class DualImageRegistration:
             
         elif overlay_mode == 'thermal_overlay':
             # Overlay termico: converti a RGB e sovrapponi con colormap
-            result_rgb = np.stack([ref_img, ref_img, ref_img], axis=2)
+            result_rgb = self._overlay_buffer(out, ref_img.shape + (3,), ref_img.dtype)
+            for i in range(3):
+                result_rgb[:, :, i] = ref_img
             
             # Applica colormap alla target (termica)
-            thermal_colored = plt.cm.hot(reg_target)[:, :, :3]  # Solo RGB, no alpha
+            thermal_colored = colormaps['hot'](reg_target)[:, :, :3]  # Solo RGB, no alpha
             
             # Overlay con trasparenza
             alpha = 0.6
@@ -419,10 +434,54 @@ class DualImageRegistration:
             
         elif overlay_mode == 'side_by_side':
             # Affianca le immagini
-            result = np.hstack([ref_img, np.zeros_like(ref_img)])
-            result[:, ref_img.shape[1]:] = reg_target
+            h, w = ref_img.shape
+            result = self._overlay_buffer(out, (h, 2 * w), ref_img.dtype)
+            result[:, :w] = ref_img
+            result[:, w:] = reg_target
             
         else:
-            result = ref_img.copy()
+            result = self._overlay_buffer(out, ref_img.shape, ref_img.dtype)
+            np.copyto(result, ref_img)
+        
+        return result
+    
+    @staticmethod
+    def save_visualization(image: np.ndarray, output_path: str,
+                           metadata: Optional[Dict[str, Any]] = None,
+                           compress_level: Optional[int] = None) -> bool:
+        """
+        Salva una visualizzazione su disco tramite PIL (senza matplotlib)
+        
+        Args:
+            image: Immagine RGB in [0, 1] oppure scala di grigi
+            output_path: Percorso file di output
+            metadata: Metadati da incorporare (solo PNG, chunk di testo JSON)
+            compress_level: Livello zlib PNG (0-9); se None usa la compressione ottimizzata
+            
+        Returns:
+            True se i metadati sono stati incorporati nel file
+        """
+        if image.ndim == 3:
+            # RGB float in [0, 1] -> uint8
+            data = (np.clip(image, 0.0, 1.0) * 255).astype(np.uint8)
+            pil_image = Image.fromarray(data)
+        else:
+            # Scala di grigi: normalizzazione min-max come plt.imsave
+            vmin, vmax = float(image.min()), float(image.max())
+            scale = 255.0 / (vmax - vmin) if vmax > vmin else 0.0
+            data = ((image - vmin) * scale).astype(np.uint8)
+            pil_image = Image.fromarray(data).convert('L')
+        
+        if output_path.lower().endswith('.png'):
+            pnginfo = None
+            if metadata is not None:
+                pnginfo = PngImagePlugin.PngInfo()
+                pnginfo.add_text("RegistrationMetadata", json.dumps(metadata))
+            if compress_level is None:
+                pil_image.save(output_path, optimize=True, pnginfo=pnginfo)
+            else:
+                pil_image.save(output_path, compress_level=compress_level, pnginfo=pnginfo)
+            return pnginfo is not None
         
-        return result
\ No newline at end of file
+        pil_image.save(output_path)
+        return False
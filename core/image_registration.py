@@ -13,7 +13,6 @@ from skimage.filters import gaussian
 from skimage.exposure import match_histograms
 from typing import List, Tuple, Optional, Dict
 import logging
-from tqdm import tqdm
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -42,6 +41,16 @@ except ImportError:
         from core.metadata_utils import MetadataManager
 
 
+class RegistrationCancelled(Exception):
+    """Sollevata quando la registrazione viene interrotta tramite cancel_event"""
+
+
+def _check_cancelled(cancel_event) -> None:
+    """Solleva RegistrationCancelled se l'evento di annullamento è impostato"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise RegistrationCancelled()
+
+
 class ImageRegistration:
     """
     Advanced class for multiband image registration using SLIC,
@@ -383,15 +392,21 @@ class ImageRegistration:
 
         return registered, method_used
 
-    def register_bands(self, band_paths: List[str]) -> Tuple[List[np.ndarray], List[Dict], List[np.ndarray]]:
+    def register_bands(self, band_paths: List[str],
+                       cancel_event=None) -> Tuple[List[np.ndarray], List[Dict], List[np.ndarray]]:
         """
         Registra un gruppo di 5 bande usando metodi avanzati
 
         Args:
             band_paths: Lista dei percorsi delle 5 bande
+            cancel_event: Evento opzionale (threading/multiprocessing) che interrompe
+                          la registrazione tra una banda e l'altra
 
         Returns:
             Tuple (bande registrate, metadati, matrici di registrazione)
+
+        Raises:
+            RegistrationCancelled: Se cancel_event viene impostato durante l'elaborazione
         """
         if not validate_image_group(band_paths):
             raise ValueError(f"Image group non valido: {band_paths}")
@@ -404,6 +419,7 @@ class ImageRegistration:
 
         if self.preserve_metadata:
             for path in band_paths:
+                _check_cancelled(cancel_event)
                 band, metadata = load_image_band_with_metadata(path)
                 bands.append(band)
                 metadata_list.append(metadata)
@@ -413,6 +429,7 @@ class ImageRegistration:
                 self.metadata_manager.validate_spatial_consistency(metadata_list)
         else:
             for path in band_paths:
+                _check_cancelled(cancel_event)
                 band = load_image_band(path)
                 bands.append(band)
                 metadata_list.append({})
@@ -422,6 +439,7 @@ class ImageRegistration:
         reference_band = self.preprocess_image(bands[self.reference_band], enhance_contrast=True)
 
         for i, band in enumerate(bands):
+            _check_cancelled(cancel_event)
             if i == self.reference_band:
                 processed = reference_band
             else:
@@ -455,6 +473,7 @@ class ImageRegistration:
         registration_matrices = []
 
         for i, processed_band in enumerate(processed_bands):
+            _check_cancelled(cancel_event)
             if i == self.reference_band:
                 # Reference band remains unchanged
                 registered_bands.append(bands[i])
@@ -476,20 +495,25 @@ class ImageRegistration:
 
         return registered_bands, metadata_list, registration_matrices
     
-    def process_image_group(self, band_paths: List[str], output_path: str) -> bool:
+    def process_image_group(self, band_paths: List[str], output_path: str,
+                            cancel_event=None) -> bool:
         """
         Processa un singolo image group
 
         Args:
             band_paths: Lista dei percorsi delle bande
             output_path: Percorso del output file
+            cancel_event: Evento opzionale per interrompere l'elaborazione
 
         Returns:
             True se il processing è successful
         """
         try:
             # Register bands
-            registered_bands, metadata_list, registration_matrices = self.register_bands(band_paths)
+            registered_bands, metadata_list, registration_matrices = self.register_bands(
+                band_paths, cancel_event=cancel_event
+            )
+            _check_cancelled(cancel_event)
 
             # Save result con o senza metadati
             if self.preserve_metadata and metadata_list and metadata_list[self.reference_band]:
@@ -512,6 +536,10 @@ class ImageRegistration:
 
             return True
 
+        except RegistrationCancelled:
+            self.logger.info(f"Processing annullato: {band_paths}")
+            return False
+
         except Exception as e:
             self.logger.error(f"Error nel processing di {band_paths}: {str(e)}")
             return False
@@ -574,9 +574,12 @@ class MetadataManager:
         except Exception as e:
             self.logger.error(f"Error nel salvataggio con metadati: {str(e)}")
             # Fallback: salva senza metadati usando tifffile
-            import tifffile
-            multiband_image = np.stack(bands, axis=0)
-            tifffile.imwrite(output_path, multiband_image, photometric='minisblack')
+            # Scrittura a tile banda per banda, senza copia impilata in memoria
+            try:
+                from ..utils.utils import save_multiband_tiff
+            except ImportError:
+                from utils.utils import save_multiband_tiff
+            save_multiband_tiff(bands, output_path)
             self.logger.warning(f"Saved without geospatial metadata: {output_path}")
     
     def validate_spatial_consistency(self, metadata_list: List[Dict[str, Any]]) -> bool:
@@ -7,13 +7,105 @@ Estrae latitudine, longitudine e altitudine dai metadati EXIF.
 import tifffile
 import sys
 import os
+import importlib.util
+import mmap
+import struct
 from fractions import Fraction
 
-try:
-    import rasterio
-    RASTERIO_AVAILABLE = True
-except ImportError:
-    RASTERIO_AVAILABLE = False
+# rasterio (e GDAL) viene importato solo al primo utilizzo
+RASTERIO_AVAILABLE = importlib.util.find_spec("rasterio") is not None
+_rasterio = None
+
+# numba opzionale per la conversione GPS in batch (compilata al primo utilizzo)
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+_gps_batch_kernel = None
+
+# Fattore di scala dei valori GPS MicaSense (10^7)
+_GPS_SCALE = 10000000.0
+
+# Tag TIFF/EXIF per la lettura diretta dell'IFD GPS
+_GPS_IFD_TAG = 34853
+_GPS_TAG_NAMES = {
+    1: 'GPSLatitudeRef',
+    2: 'GPSLatitude',
+    3: 'GPSLongitudeRef',
+    4: 'GPSLongitude',
+    5: 'GPSAltitudeRef',
+    6: 'GPSAltitude',
+    11: 'GPSDOP',
+}
+# Tipo TIFF -> (formato struct, dimensione in byte)
+_TIFF_TYPE_FORMATS = {
+    1: ('B', 1),   # BYTE
+    2: ('s', 1),   # ASCII
+    3: ('H', 2),   # SHORT
+    4: ('I', 4),   # LONG
+    5: ('I', 8),   # RATIONAL
+    7: ('B', 1),   # UNDEFINED
+    9: ('i', 4),   # SLONG
+    10: ('i', 8),  # SRATIONAL
+}
+
+
+def _get_rasterio():
+    """Importa rasterio al primo utilizzo e lo memorizza a livello di modulo"""
+    global _rasterio
+    if _rasterio is None:
+        import rasterio
+        _rasterio = rasterio
+    return _rasterio
+
+
+def _dms_to_decimal(degrees, minutes, seconds):
+    """Converte gradi, minuti e secondi (scalati di 10^7) in gradi decimali"""
+    return (degrees + minutes / 60.0 + seconds / 3600.0) / _GPS_SCALE
+
+
+def _dms_batch_to_decimal(dms, out):
+    """Versione vettoriale di _dms_to_decimal su un array (N, 3) float64"""
+    out[:] = (dms[:, 0] + dms[:, 1] / 60.0 + dms[:, 2] / 3600.0) / _GPS_SCALE
+    return out
+
+
+def _dms_batch_loop(dms, out):
+    """Kernel a ciclo esplicito di _dms_to_decimal, compilato con numba da _get_gps_batch_kernel"""
+    for i in range(dms.shape[0]):
+        out[i] = (dms[i, 0] + dms[i, 1] / 60.0 + dms[i, 2] / 3600.0) / _GPS_SCALE
+    return out
+
+
+def _get_gps_batch_kernel():
+    """
+    Restituisce il kernel di conversione batch, compilato con numba se disponibile
+    
+    numba viene importato solo alla prima chiamata e la compilazione vera e
+    propria avviene al primo utilizzo del kernel (con cache su disco), così
+    l'avvio dello script da riga di comando resta immediato.
+    """
+    global _gps_batch_kernel
+    if _gps_batch_kernel is None:
+        kernel = _dms_batch_to_decimal
+        if NUMBA_AVAILABLE:
+            try:
+                from numba import njit
+                kernel = njit(cache=True)(_dms_batch_loop)
+            except Exception:
+                kernel = _dms_batch_to_decimal
+        _gps_batch_kernel = kernel
+    return _gps_batch_kernel
+
+
+def _parse_dms(gps_coord):
+    """
+    Estrae (gradi, minuti, secondi) come float da una coordinata GPS
+    
+    Le tre componenti hanno sempre lo stesso tipo, quindi il tipo viene
+    controllato una sola volta sulla prima.
+    """
+    if isinstance(gps_coord[0], tuple):
+        # Componenti nel formato (numeratore, denominatore)
+        return tuple(val[0] / val[1] for val in gps_coord[:3])
+    return float(gps_coord[0]), float(gps_coord[1]), float(gps_coord[2])
 
 
 def gps_fraction_to_decimal(gps_coord):
@@ -26,21 +118,172 @@ def gps_fraction_to_decimal(gps_coord):
     Returns:
         float: Coordinata in formato decimale
     """
-    # Gestisce il caso in cui i valori sono già numerici o tuple
-    def parse_value(val):
-        if isinstance(val, (int, float)):
-            return float(val)
-        elif isinstance(val, tuple) and len(val) == 2:
-            return Fraction(val[0], val[1])
-        else:
-            return float(val)
-    
     # I valori GPS sono in formato (numeratore, denominatore) per ogni componente
-    degrees = parse_value(gps_coord[0]) / 10000000  # Diviso per 10^7
-    minutes = parse_value(gps_coord[1]) / 10000000  # Diviso per 10^7
-    seconds = parse_value(gps_coord[2]) / 10000000  # Diviso per 10^7
+    return float(_dms_to_decimal(*_parse_dms(gps_coord)))
+
+
+def gps_batch_to_decimal(gps_coords):
+    """
+    Converte in gradi decimali una sequenza di coordinate GPS (es. un intero volo).
+    
+    Args:
+        gps_coords: Sequenza di coordinate nel formato accettato da gps_fraction_to_decimal
+        
+    Returns:
+        numpy.ndarray: Coordinate in formato decimale (float64)
+    """
+    import numpy as np
+    
+    dms = np.array(
+        [_parse_dms(coord) for coord in gps_coords], dtype=np.float64
+    ).reshape(-1, 3)
+    
+    out = np.empty(dms.shape[0], dtype=np.float64)
+    
+    global _gps_batch_kernel
+    kernel = _get_gps_batch_kernel()
+    try:
+        # Con numba la compilazione avviene qui: in caso di errore si passa a numpy
+        return kernel(dms, out)
+    except Exception:
+        if kernel is _dms_batch_to_decimal:
+            raise
+        _gps_batch_kernel = _dms_batch_to_decimal
+        return _dms_batch_to_decimal(dms, out)
+
+
+def _iter_ifd_entries(mm, byteorder, ifd_offset):
+    """Itera le voci (tag, tipo, count, offset campo valore) di un IFD TIFF classico"""
+    (n_entries,) = struct.unpack_from(byteorder + 'H', mm, ifd_offset)
+    entry_offset = ifd_offset + 2
+    for _ in range(n_entries):
+        tag, tag_type, count = struct.unpack_from(byteorder + 'HHI', mm, entry_offset)
+        yield tag, tag_type, count, entry_offset + 8
+        entry_offset += 12
+
+
+def _read_ifd_value(mm, byteorder, tag_type, count, field_offset):
+    """Legge il valore di una voce IFD restituendolo nel formato di tifffile"""
+    fmt, size = _TIFF_TYPE_FORMATS[tag_type]
+    if size * count <= 4:
+        data_offset = field_offset
+    else:
+        (data_offset,) = struct.unpack_from(byteorder + 'I', mm, field_offset)
+    
+    if tag_type == 2:
+        # ASCII: stringa terminata da NUL
+        raw = mm[data_offset:data_offset + count]
+        return raw.split(b'\0', 1)[0].decode('ascii', errors='replace').strip()
     
-    return float(degrees + minutes/60 + seconds/3600)
+    # RATIONAL/SRATIONAL: coppie (numeratore, denominatore) appiattite
+    n_values = count * 2 if tag_type in (5, 10) else count
+    values = struct.unpack_from(f"{byteorder}{n_values}{fmt}", mm, data_offset)
+    return values[0] if n_values == 1 else values
+
+
+def _read_gps_ifd(tiff_path):
+    """
+    Legge solo l'IFD GPS di un file TIFF tramite mmap, senza costruire le pagine tifffile.
+    
+    Args:
+        tiff_path: Percorso al file TIFF
+        
+    Returns:
+        dict: Tag GPS con i nomi di tifffile ({} se assenti),
+              None se il formato non è gestito (es. BigTIFF)
+    """
+    with open(tiff_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header = mm[:2]
+            if header == b'II':
+                byteorder = '<'
+            elif header == b'MM':
+                byteorder = '>'
+            else:
+                return None
+            
+            magic, ifd0_offset = struct.unpack_from(byteorder + 'HI', mm, 2)
+            if magic != 42:
+                return None  # BigTIFF (43) delegato a tifffile
+            
+            # Cerca il puntatore all'IFD GPS nell'IFD0
+            gps_offset = None
+            for tag, tag_type, count, field_offset in _iter_ifd_entries(mm, byteorder, ifd0_offset):
+                if tag == _GPS_IFD_TAG:
+                    (gps_offset,) = struct.unpack_from(byteorder + 'I', mm, field_offset)
+                    break
+            
+            if not gps_offset:
+                return {}
+            
+            gps_tag = {}
+            for tag, tag_type, count, field_offset in _iter_ifd_entries(mm, byteorder, gps_offset):
+                name = _GPS_TAG_NAMES.get(tag)
+                if name is not None and tag_type in _TIFF_TYPE_FORMATS:
+                    gps_tag[name] = _read_ifd_value(mm, byteorder, tag_type, count, field_offset)
+            
+            return gps_tag
+
+
+def _read_gps_tag_tifffile(tiff_path):
+    """Legge il tag GPS tramite tifffile (percorso completo, supporta BigTIFF)"""
+    with tifffile.TiffFile(tiff_path) as tif:
+        page = tif.pages[0]
+        
+        # Cerca il tag GPS
+        for tag in page.tags:
+            if tag.name == 'GPSTag':
+                return tag.value
+    
+    return None
+
+
+def _gps_data_from_tags(gps_tag):
+    """
+    Converte i tag GPS EXIF nel dizionario di coordinate restituito dallo script.
+    
+    Args:
+        gps_tag: Dizionario dei tag GPS (nomi tifffile)
+        
+    Returns:
+        dict: Dizionario con latitudine, longitudine e altitudine
+    """
+    gps_data = {}
+    
+    # Latitudine
+    if 'GPSLatitude' in gps_tag and 'GPSLatitudeRef' in gps_tag:
+        lat_decimal = gps_fraction_to_decimal(gps_tag['GPSLatitude'])
+        if gps_tag['GPSLatitudeRef'] == 'S':
+            lat_decimal = -lat_decimal
+        gps_data['latitude'] = lat_decimal
+        gps_data['latitude_ref'] = gps_tag['GPSLatitudeRef']
+    
+    # Longitudine
+    if 'GPSLongitude' in gps_tag and 'GPSLongitudeRef' in gps_tag:
+        lon_decimal = gps_fraction_to_decimal(gps_tag['GPSLongitude'])
+        if gps_tag['GPSLongitudeRef'] == 'W':
+            lon_decimal = -lon_decimal
+        gps_data['longitude'] = lon_decimal
+        gps_data['longitude_ref'] = gps_tag['GPSLongitudeRef']
+    
+    # Altitudine
+    if 'GPSAltitude' in gps_tag:
+        alt_frac = gps_tag['GPSAltitude']
+        altitude = Fraction(alt_frac[0], alt_frac[1])
+        gps_data['altitude'] = float(altitude)
+        
+        # Riferimento altitudine (0 = sopra il livello del mare, 1 = sotto)
+        if 'GPSAltitudeRef' in gps_tag:
+            if gps_tag['GPSAltitudeRef'] == 1:
+                gps_data['altitude'] = -gps_data['altitude']
+    
+    # DOP (Dilution of Precision)
+    if 'GPSDOP' in gps_tag:
+        dop = gps_tag['GPSDOP']
+        if dop[1] != 0:  # Evita divisione per zero
+            gps_data['dop'] = float(Fraction(dop[0], dop[1]))
+    
+    return gps_data
 
 
 def extract_gps_coordinates(tiff_path):
@@ -57,24 +300,30 @@ def extract_gps_coordinates(tiff_path):
     # Prima prova con rasterio (per file processati)
     if RASTERIO_AVAILABLE:
         try:
-            with rasterio.open(tiff_path) as src:
-                tags = src.tags()
+            rasterio = _get_rasterio()
+            with rasterio.open(tiff_path, sharing=False) as src:
+                # Legge solo i tag necessari senza costruire il dizionario completo
+                get_tag = src.get_tag_item
                 gps_data = {}
                 
                 # Cerca tag GPS nei metadati rasterio
-                if 'GPS_LATITUDE' in tags:
-                    gps_data['latitude'] = float(tags['GPS_LATITUDE'])
-                    gps_data['latitude_ref'] = tags.get('GPS_LATITUDE_REF', 'N')
+                latitude = get_tag('GPS_LATITUDE')
+                if latitude is not None:
+                    gps_data['latitude'] = float(latitude)
+                    gps_data['latitude_ref'] = get_tag('GPS_LATITUDE_REF') or 'N'
                 
-                if 'GPS_LONGITUDE' in tags:
-                    gps_data['longitude'] = float(tags['GPS_LONGITUDE'])
-                    gps_data['longitude_ref'] = tags.get('GPS_LONGITUDE_REF', 'E')
+                longitude = get_tag('GPS_LONGITUDE')
+                if longitude is not None:
+                    gps_data['longitude'] = float(longitude)
+                    gps_data['longitude_ref'] = get_tag('GPS_LONGITUDE_REF') or 'E'
                 
-                if 'GPS_ALTITUDE' in tags:
-                    gps_data['altitude'] = float(tags['GPS_ALTITUDE'])
+                altitude = get_tag('GPS_ALTITUDE')
+                if altitude is not None:
+                    gps_data['altitude'] = float(altitude)
                 
-                if 'GPS_DOP' in tags:
-                    gps_data['dop'] = float(tags['GPS_DOP'])
+                dop = get_tag('GPS_DOP')
+                if dop is not None:
+                    gps_data['dop'] = float(dop)
                 
                 if gps_data:
                     return gps_data
@@ -82,58 +331,21 @@ def extract_gps_coordinates(tiff_path):
         except Exception:
             pass  # Fallback to tifffile method
     
-    # Fallback: prova con tifffile (per file originali)
+    # Fallback: legge direttamente l'IFD GPS (per file originali)
     try:
-        with tifffile.TiffFile(tiff_path) as tif:
-            page = tif.pages[0]
-            
-            # Cerca il tag GPS
-            gps_tag = None
-            for tag in page.tags:
-                if tag.name == 'GPSTag':
-                    gps_tag = tag.value
-                    break
-            
-            if not gps_tag:
-                return {"error": "Nessun dato GPS trovato nel file"}
-            
-            # Estrai i dati GPS
-            gps_data = {}
-            
-            # Latitudine
-            if 'GPSLatitude' in gps_tag and 'GPSLatitudeRef' in gps_tag:
-                lat_decimal = gps_fraction_to_decimal(gps_tag['GPSLatitude'])
-                if gps_tag['GPSLatitudeRef'] == 'S':
-                    lat_decimal = -lat_decimal
-                gps_data['latitude'] = lat_decimal
-                gps_data['latitude_ref'] = gps_tag['GPSLatitudeRef']
-            
-            # Longitudine
-            if 'GPSLongitude' in gps_tag and 'GPSLongitudeRef' in gps_tag:
-                lon_decimal = gps_fraction_to_decimal(gps_tag['GPSLongitude'])
-                if gps_tag['GPSLongitudeRef'] == 'W':
-                    lon_decimal = -lon_decimal
-                gps_data['longitude'] = lon_decimal
-                gps_data['longitude_ref'] = gps_tag['GPSLongitudeRef']
-            
-            # Altitudine
-            if 'GPSAltitude' in gps_tag:
-                alt_frac = gps_tag['GPSAltitude']
-                altitude = Fraction(alt_frac[0], alt_frac[1])
-                gps_data['altitude'] = float(altitude)
-                
-                # Riferimento altitudine (0 = sopra il livello del mare, 1 = sotto)
-                if 'GPSAltitudeRef' in gps_tag:
-                    if gps_tag['GPSAltitudeRef'] == 1:
-                        gps_data['altitude'] = -gps_data['altitude']
-            
-            # DOP (Dilution of Precision)
-            if 'GPSDOP' in gps_tag:
-                dop = gps_tag['GPSDOP']
-                if dop[1] != 0:  # Evita divisione per zero
-                    gps_data['dop'] = float(Fraction(dop[0], dop[1]))
-            
-            return gps_data
+        gps_tag = _read_gps_ifd(tiff_path)
+    except (OSError, ValueError, struct.error):
+        gps_tag = None
+    
+    try:
+        if gps_tag is None:
+            # Formato non gestito dal parser diretto (es. BigTIFF): usa tifffile
+            gps_tag = _read_gps_tag_tifffile(tiff_path)
+        
+        if not gps_tag:
+            return {"error": "Nessun dato GPS trovato nel file"}
+        
+        return _gps_data_from_tags(gps_tag)
             
     except Exception as e:
         return {"error": f"Errore nella lettura del file: {str(e)}"}
@@ -8,20 +8,26 @@ tipicamente un'immagine termica e un'immagine RGB.
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 import os
+import json
 from datetime import datetime
+from pathlib import Path
 from typing import Optional, Dict, Any
 
-try:
-    from ..core.dual_image_registration import DualImageRegistration
-except ImportError:
+# Template per nome file del salvataggio
+_SUGGESTED_NAME_TEMPLATE = "dual_registration_{ref}_{target}_{mode}_{ts}.png"
+
+
+def _import_dual_registration():
+    """Importa DualImageRegistration (OpenCV, scikit-image) solo al primo utilizzo"""
     try:
-        from core.dual_image_registration import DualImageRegistration
+        from ..core.dual_image_registration import DualImageRegistration
     except ImportError:
-        from dual_image_registration import DualImageRegistration
+        try:
+            from core.dual_image_registration import DualImageRegistration
+        except ImportError:
+            from dual_image_registration import DualImageRegistration
+    return DualImageRegistration
 
 
 class DualRegistrationWindow:
@@ -45,7 +51,10 @@ class DualRegistrationWindow:
         self.reference_path = None
         self.target_path = None
         self.registration_result = None
-        self.registrator = DualImageRegistration()
+        self._registrator = None
+        
+        # Cache overlay per (risultato, modalità visualizzazione)
+        self._overlay_cache: Dict[tuple, np.ndarray] = {}
         
         # Setup UI
         self.setup_ui()
@@ -54,6 +63,13 @@ class DualRegistrationWindow:
         if not parent:
             self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
     
+    @property
+    def registrator(self):
+        """Registratore dual image, creato al primo utilizzo"""
+        if self._registrator is None:
+            self._registrator = _import_dual_registration()()
+        return self._registrator
+    
     def setup_ui(self):
         """Configura l'interfaccia utente"""
         # Frame principale
@@ -158,6 +174,10 @@ class DualRegistrationWindow:
         viz_frame = ttk.LabelFrame(parent, text="Visualizzazione", padding=5)
         viz_frame.pack(fill="both", expand=True)
         
+        # Import matplotlib solo quando serve la visualizzazione
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        
         # Figura matplotlib
         self.fig = Figure(figsize=(12, 6), dpi=100)
         
@@ -278,7 +298,8 @@ class DualRegistrationWindow:
             self.status_var.set("Registrazione in corso...")
             self.window.update()
             
-            # Esegui registrazione
+            # Esegui registrazione (invalida gli overlay del risultato precedente)
+            self._overlay_cache.clear()
             self.registration_result = self.registrator.register_images(
                 self.reference_path, self.target_path
             )
@@ -299,6 +320,17 @@ class DualRegistrationWindow:
             self.status_var.set("Errore nella registrazione")
             messagebox.showerror("Errore Registrazione", f"Errore:\\n{e}")
     
+    def _get_overlay(self, overlay_mode: str) -> np.ndarray:
+        """Restituisce l'overlay per la modalità richiesta, calcolandolo una sola volta"""
+        key = (id(self.registration_result), overlay_mode)
+        overlay_image = self._overlay_cache.get(key)
+        if overlay_image is None:
+            overlay_image = self.registrator.create_overlay_visualization(
+                self.registration_result, overlay_mode
+            )
+            self._overlay_cache[key] = overlay_image
+        return overlay_image
+    
     def update_visualization(self, event=None):
         """Aggiorna visualizzazione risultato"""
         if not self.registration_result:
@@ -307,9 +339,7 @@ class DualRegistrationWindow:
         try:
             # Crea visualizzazione
             overlay_mode = self.viz_mode_var.get()
-            overlay_image = self.registrator.create_overlay_visualization(
-                self.registration_result, overlay_mode
-            )
+            overlay_image = self._get_overlay(overlay_mode)
             
             # Mostra risultato
             self.fig.clear()
@@ -349,13 +379,15 @@ class DualRegistrationWindow:
             messagebox.showwarning("Attenzione", "Nessun risultato da salvare")
             return
         
-        # Genera nome file
+        # Genera nome file (nomi e modalità calcolati una sola volta)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        ref_name = os.path.splitext(os.path.basename(self.reference_path))[0]
-        target_name = os.path.splitext(os.path.basename(self.target_path))[0]
+        ref_name = Path(self.reference_path).stem
+        target_name = Path(self.target_path).stem
         overlay_mode = self.viz_mode_var.get()
         
-        suggested_name = f"dual_registration_{ref_name}_{target_name}_{overlay_mode}_{timestamp}.png"
+        suggested_name = _SUGGESTED_NAME_TEMPLATE.format(
+            ref=ref_name, target=target_name, mode=overlay_mode, ts=timestamp
+        )
         
         # Dialog salvataggio
         file_path = filedialog.asksaveasfilename(
@@ -372,32 +404,28 @@ class DualRegistrationWindow:
         
         if file_path:
             try:
+                result = self.registration_result
+                
                 # Crea visualizzazione per salvataggio
-                overlay_image = self.registrator.create_overlay_visualization(
-                    self.registration_result, self.viz_mode_var.get()
-                )
+                overlay_image = self._get_overlay(overlay_mode)
                 
-                # Salva
-                if self.viz_mode_var.get() == 'thermal_overlay':
-                    plt.imsave(file_path, overlay_image)
-                else:
-                    plt.imsave(file_path, overlay_image, cmap='gray')
+                # Metadati della registrazione
+                transform = result['transform_matrix']
+                metadata = {
+                    'timestamp': timestamp,
+                    'reference_image': self.reference_path,
+                    'target_image': self.target_path,
+                    'registration_method': result['method_used'],
+                    'scale_factor': float(result['scale_factor']),
+                    'overlay_mode': overlay_mode,
+                    'transform_matrix': transform.tolist() if transform is not None else None
+                }
                 
-                # Salva anche metadati
-                metadata_path = os.path.splitext(file_path)[0] + "_metadata.txt"
-                with open(metadata_path, 'w') as f:
-                    f.write(f"Dual Image Registration Metadata\\n")
-                    f.write(f"Timestamp: {timestamp}\\n")
-                    f.write(f"Reference Image: {self.reference_path}\\n")
-                    f.write(f"Target Image: {self.target_path}\\n")
-                    f.write(f"Registration Method: {self.registration_result['method_used']}\\n")
-                    f.write(f"Scale Factor: {self.registration_result['scale_factor']:.4f}\\n")
-                    f.write(f"Overlay Mode: {self.viz_mode_var.get()}\\n")
-                    
-                    # Transform matrix
-                    if self.registration_result['transform_matrix'] is not None:
-                        f.write(f"Transform Matrix:\\n")
-                        f.write(f"{self.registration_result['transform_matrix']}\\n")
+                # Salva (per PNG i metadati sono incorporati come chunk di testo)
+                if self.registrator.save_visualization(overlay_image, file_path, metadata):
+                    metadata_path = file_path
+                else:
+                    metadata_path = self._write_metadata(file_path, metadata)
                 
                 messagebox.showinfo("Successo", 
                     f"Risultato salvato:\\n{file_path}\\n\\nMetadati salvati:\\n{metadata_path}")
@@ -405,6 +433,34 @@ class DualRegistrationWindow:
             except Exception as e:
                 messagebox.showerror("Errore Salvataggio", f"Errore:\\n{e}")
     
+    def _write_metadata(self, file_path: str, metadata: Dict[str, Any]) -> str:
+        """
+        Salva i metadati della registrazione
+        
+        Per output TIFF (con rasterio disponibile) i metadati vengono scritti
+        come tag nel file stesso, altrimenti in un file JSON affiancato.
+        
+        Returns:
+            Percorso del file che contiene i metadati
+        """
+        if file_path.lower().endswith(('.tif', '.tiff')):
+            try:
+                import rasterio
+                tags = {
+                    key: json.dumps(value) if not isinstance(value, str) else value
+                    for key, value in metadata.items()
+                }
+                with rasterio.open(file_path, 'r+') as dst:
+                    dst.update_tags(**tags)
+                return file_path
+            except Exception:
+                pass  # Fallback su file JSON
+        
+        metadata_path = os.path.splitext(file_path)[0] + "_metadata.json"
+        with open(metadata_path, 'w') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        return metadata_path
+    
     def on_closing(self):
         """Gestisce chiusura finestra"""
         self.window.destroy()
@@ -168,9 +168,9 @@ class FileSelector:
         )
         
         if folder_path:
-            # Verifica che la cartella contenga file TIFF
-            tiff_files = self._find_tiff_files(folder_path)
-            if not tiff_files:
+            # Verifica che la cartella contenga file TIFF (basta trovarne uno);
+            # solo il primo livello, come la ricerca dei gruppi
+            if self._find_first_tiff(folder_path, recursive=False) is None:
                 messagebox.showwarning(
                     "Cartella Vuota",
                     "La cartella selezionata non contiene file TIFF."
@@ -199,6 +199,30 @@ class FileSelector:
         
         return [str(f) for f in sorted(tiff_files)]
     
+    def _find_first_tiff(self, folder_path: str, recursive: bool = True) -> Optional[str]:
+        """
+        Trova il primo file TIFF in una cartella (fermandosi al primo trovato)
+        
+        Le sottocartelle vengono esplorate solo se il livello corrente
+        non contiene file TIFF e recursive è True.
+        """
+        stack = [folder_path]
+        while stack:
+            current = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_file() and entry.name.lower().endswith((".tif", ".tiff")):
+                            return entry.path
+                        if recursive and entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+            except OSError:
+                continue
+            stack.extend(reversed(subdirs))
+        
+        return None
+    
     def update_preview(self):
         """Aggiorna la preview della selezione"""
         # Pulisci listbox
@@ -9,7 +9,6 @@ per navigazione bande, composizioni RGB e calcolo NDVI.
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import numpy as np
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
 import tifffile
@@ -17,6 +16,34 @@ from typing import Optional, Callable
 import os
 
 
+def read_image_file(file_path: str) -> np.ndarray:
+    """
+    Decodifica un file immagine in un array di bande (nessuna operazione Tk,
+    può essere eseguita in un thread di lavoro)
+    
+    Args:
+        file_path: Percorso del file immagine (TIFF o JPG)
+        
+    Returns:
+        Array delle bande (per JPG una singola banda in scala di grigi)
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    
+    if file_ext in ['.jpg', '.jpeg']:
+        # Per file JPG, carica come singola banda
+        from PIL import Image
+        with Image.open(file_path) as img:
+            # Converti in grayscale se necessario
+            if img.mode in ['RGB', 'RGBA']:
+                img = img.convert('L')
+            img_array = np.array(img).astype(np.float32)
+            # Aggiungi dimensione banda
+            return np.expand_dims(img_array, axis=0)
+    
+    # Per file TIFF, usa tifffile
+    return tifffile.imread(file_path)
+
+
 class ImageViewer:
     """Visualizzatore integrato per immagini multispettrali"""
     
@@ -37,6 +64,7 @@ class ImageViewer:
         self.current_band = 0
         self.view_mode = "bands"  # "bands", "rgb", "ndvi"
         self.colorbar = None  # Riferimento alla colorbar corrente
+        self._array_image = None  # AxesImage dell'ultimo display_array (riusato se compatibile)
         self.project_visualizations_dir = None  # Cartella visualizzazioni progetto
         
         # Nomi bande MicaSense
@@ -166,23 +194,27 @@ class ImageViewer:
             True se caricamento riuscito
         """
         try:
-            # Determina il tipo di file
-            file_ext = os.path.splitext(file_path)[1].lower()
-            
-            if file_ext in ['.jpg', '.jpeg']:
-                # Per file JPG, carica come singola banda
-                from PIL import Image
-                with Image.open(file_path) as img:
-                    # Converti in grayscale se necessario
-                    if img.mode in ['RGB', 'RGBA']:
-                        img = img.convert('L')
-                    img_array = np.array(img).astype(np.float32)
-                    # Aggiungi dimensione banda
-                    self.bands_data = np.expand_dims(img_array, axis=0)
-            else:
-                # Per file TIFF, usa tifffile
-                self.bands_data = tifffile.imread(file_path)
+            bands_data = read_image_file(file_path)
+        except Exception as e:
+            messagebox.showerror("Errore Caricamento", f"Impossibile caricare l'immagine:\n{e}")
+            return False
+        
+        return self.load_image_from_array(bands_data, file_path)
+    
+    def load_image_from_array(self, bands_data: np.ndarray, file_path: str) -> bool:
+        """
+        Mostra un'immagine già decodificata (da chiamare nel thread GUI)
+        
+        Args:
+            bands_data: Array bande restituito da read_image_file
+            file_path: Percorso del file di origine
             
+        Returns:
+            True se caricamento riuscito
+        """
+        try:
+            file_ext = os.path.splitext(file_path)[1].lower()
+            self.bands_data = bands_data
             self.current_file = file_path
             
             # Verifica formato
@@ -234,14 +266,6 @@ class ImageViewer:
             cmap: Colormap da usare ('gray', 'hot', etc.)
         """
         try:
-            # Pulisci display precedente
-            self.ax.clear()
-            
-            # Rimuovi colorbar precedente
-            if self.colorbar is not None:
-                self.colorbar.remove()
-                self.colorbar = None
-            
             # Normalizza se necessario
             if image_array.dtype != np.uint8:
                 if image_array.max() <= 1.0:
@@ -254,27 +278,44 @@ class ImageViewer:
             else:
                 display_array = image_array
             
-            # Gestisci array RGB
-            if len(display_array.shape) == 3 and display_array.shape[2] == 3:
-                # Immagine RGB
-                im = self.ax.imshow(display_array)
-            else:
-                # Immagine grayscale
-                im = self.ax.imshow(display_array, cmap=cmap)
-                
-                # Aggiungi colorbar per immagini non RGB
-                if cmap != 'gray':
-                    self.colorbar = self.fig.colorbar(im, ax=self.ax)
+            # Stessa forma e colormap della visualizzazione precedente: aggiorna solo i dati
+            im = self._array_image
+            if (im is not None and im in self.ax.images
+                    and im.get_array().shape == display_array.shape
+                    and im.get_cmap().name == cmap):
+                im.set_data(display_array)
+                if display_array.ndim == 2:
+                    im.set_clim(display_array.min(), display_array.max())
+                self.ax.set_title(title)
+                self.canvas.draw_idle()
+                return
             
+            # Pulisci display precedente
+            self.ax.clear()
+            
+            # Rimuovi colorbar precedente
+            if self.colorbar is not None:
+                self.colorbar.remove()
+                self.colorbar = None
+            
+            # La colormap viene ignorata per gli array RGB (resta memorizzata per il riuso)
+            im = self.ax.imshow(display_array, cmap=cmap)
+            
+            # Aggiungi colorbar per immagini non RGB
+            is_rgb = len(display_array.shape) == 3 and display_array.shape[2] == 3
+            if not is_rgb and cmap != 'gray':
+                self.colorbar = self.fig.colorbar(im, ax=self.ax)
+            
+            self._array_image = im
             self.ax.set_title(title)
             self.ax.axis('off')
             
             # Disabilita controlli multispettrali
             self.set_controls_enabled(False)
             
-            # Aggiorna canvas
+            # Aggiorna canvas (ridisegno accorpato dal ciclo eventi di Tk)
             self.fig.tight_layout()
-            self.canvas.draw()
+            self.canvas.draw_idle()
             
         except Exception as e:
             messagebox.showerror("Errore Visualizzazione", f"Impossibile visualizzare array:\n{e}")
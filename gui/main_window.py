@@ -9,30 +9,212 @@ elaborazione immagini e visualizzazione.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
+import queue
 import os
+import re
+import sys
+import subprocess
+import functools
+import hashlib
+import multiprocessing
+from collections import OrderedDict, defaultdict, namedtuple
+from operator import attrgetter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+# Visualizzatore (matplotlib) e moduli di registrazione (OpenCV, scikit-image,
+# rasterio) sono importati al primo utilizzo per ridurre il tempo di avvio
 try:
     # Import relativi (quando usato come modulo)
     from .file_selector import FileSelector
     from .project_manager import ProjectManager
-    from .image_viewer import ImageViewer
-    from ..core.image_registration import ImageRegistration
-    from ..core.dual_image_registration import DualImageRegistration
-    from ..utils.utils import find_image_groups
     from ..utils.project_logger import ProjectLogger, create_logger_for_project
 except ImportError:
     # Import assoluti (quando eseguito direttamente)
     from file_selector import FileSelector
     from project_manager import ProjectManager
-    from image_viewer import ImageViewer
-    from core.image_registration import ImageRegistration
-    from core.dual_image_registration import DualImageRegistration
-    from utils.utils import find_image_groups
     from utils.project_logger import ProjectLogger, create_logger_for_project
 
 
+# Pattern file banda IMG_xxxx_n (dove n è 1-5)
+_BAND_RE = re.compile(r'^(.+)_([1-5])$')
+
+# Nome file e nome senza estensione memorizzati per path
+_basename = functools.lru_cache(maxsize=4096)(os.path.basename)
+
+
+@functools.lru_cache(maxsize=4096)
+def _splitext_stem(path):
+    """Nome del file senza cartella ed estensione"""
+    return os.path.splitext(_basename(path))[0]
+
+
+# Informazioni di un file selezionato, calcolate una sola volta
+# (band_num e base_name sono None per file non strutturati)
+FileEntry = namedtuple("FileEntry", "path basename stem band_num base_name")
+
+# Intervallo di aggiornamento del log GUI e messaggi massimi per aggiornamento
+LOG_FLUSH_INTERVAL_MS = 50
+LOG_FLUSH_MAX_MESSAGES = 500
+LOG_MAX_LINES = 2000
+
+# Livello di compressione PNG per i risultati dual registration, per modalità:
+# blend e overlay termico (sfumature) comprimono poco, la scacchiera molto
+DUAL_PNG_COMPRESS_LEVEL = 1
+DUAL_PNG_COMPRESS_LEVELS = {
+    'thermal_overlay': 1,
+    'blend': 1,
+    'checkerboard': 6,
+    'side_by_side': 3,
+}
+
+# Job in volo per processo worker (limita i gruppi trattenuti in memoria)
+MAX_PENDING_PER_WORKER = 4
+
+# Intervallo minimo tra aggiornamenti della progress bar
+PROGRESS_FLUSH_INTERVAL_MS = 100
+
+
+# Cache LRU dei gruppi per cartella: (cartella, mtime_ns) -> gruppi
+# (una modifica della cartella cambia la chiave e invalida implicitamente la voce)
+_FOLDER_GROUPS_CACHE_SIZE = 32
+_folder_groups_cache = OrderedDict()
+_folder_groups_lock = threading.Lock()
+
+
+def _iter_folder_groups(folder):
+    """
+    Restituisce i gruppi di una cartella man mano che vengono trovati
+    
+    Se la cartella (con la stessa mtime) è in cache i gruppi vengono restituiti
+    subito, altrimenti sono prodotti in streaming da find_image_groups_iter e
+    memorizzati al termine della scansione.
+    
+    Yields:
+        Tuple (base_name, lista file ordinata)
+    """
+    key = (folder, os.stat(folder).st_mtime_ns)
+    
+    with _folder_groups_lock:
+        groups = _folder_groups_cache.get(key)
+        if groups is not None:
+            _folder_groups_cache.move_to_end(key)
+    
+    if groups is not None:
+        yield from groups.items()
+        return
+    
+    try:
+        from ..utils.utils import find_image_groups_iter
+    except ImportError:
+        from utils.utils import find_image_groups_iter
+    
+    groups = {}
+    for base_name, file_paths in find_image_groups_iter(folder):
+        groups[base_name] = file_paths
+        yield base_name, file_paths
+    
+    with _folder_groups_lock:
+        _folder_groups_cache[key] = groups
+        while len(_folder_groups_cache) > _FOLDER_GROUPS_CACHE_SIZE:
+            _folder_groups_cache.popitem(last=False)
+
+
+def _group_cache_key(file_paths, registration_method, reference_band):
+    """
+    Chiave del manifest per un gruppo: path, mtime e dimensione di ogni banda
+    più i parametri di registrazione
+    
+    Returns:
+        Digest esadecimale blake2b
+    """
+    digest = hashlib.blake2b()
+    for path in file_paths:
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}|".encode())
+    digest.update(registration_method.encode())
+    digest.update(bytes([reference_band]))
+    return digest.hexdigest()
+
+
+# Variabili d'ambiente dei thread BLAS/OpenMP limitate nei processi worker
+_WORKER_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+                           "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+# Istanza ImageRegistration ed evento di stop del processo worker (creati da _init_worker)
+_REG = None
+_CANCEL_EVENT = None
+
+
+def _init_worker(reference_band, registration_method, cancel_event=None):
+    """
+    Inizializza un processo worker creando l'istanza di registrazione condivisa
+    
+    Args:
+        reference_band: Banda di riferimento (0-based)
+        registration_method: Metodo di registrazione
+        cancel_event: Evento multiprocessing impostato alla richiesta di stop
+    """
+    # Un solo thread per le librerie numeriche di ciascun worker: il parallelismo
+    # è già tra processi (impostato prima dell'import di numpy/OpenCV)
+    for var in _WORKER_THREAD_ENV_VARS:
+        os.environ[var] = "1"
+    
+    try:
+        from ..core.image_registration import ImageRegistration
+    except ImportError:
+        from core.image_registration import ImageRegistration
+    
+    import cv2
+    cv2.setNumThreads(1)
+    
+    global _REG, _CANCEL_EVENT
+    _REG = ImageRegistration()
+    _REG.reference_band = reference_band
+    _REG.registration_method = registration_method
+    _CANCEL_EVENT = cancel_event
+
+
+def _process_group(file_paths, output_file):
+    """
+    Elabora un gruppo di immagini in un processo worker
+    
+    Args:
+        file_paths: Path delle bande del gruppo
+        output_file: Path del file registrato di output
+        
+    Returns:
+        True se l'elaborazione è riuscita (file di output scritto)
+    """
+    return _REG.process_image_group(file_paths, output_file, cancel_event=_CANCEL_EVENT)
+
+
+def _dual_register(reference_path, target_path, registration_method,
+                   scale_estimation, enhance_contrast):
+    """
+    Esegue una dual registration nel processo worker dedicato
+    
+    Args:
+        reference_path: Immagine di riferimento
+        target_path: Immagine da registrare
+        registration_method: Metodo di registrazione
+        scale_estimation: Se stimare il fattore di scala
+        enhance_contrast: Se migliorare il contrasto
+        
+    Returns:
+        Dizionario risultato di DualImageRegistration.register_images (None se fallita)
+    """
+    try:
+        from ..core.dual_image_registration import DualImageRegistration
+    except ImportError:
+        from core.dual_image_registration import DualImageRegistration
+    
+    registrator = DualImageRegistration(registration_method, scale_estimation, enhance_contrast)
+    return registrator.register_images(reference_path, target_path)
+
+
 class MainWindow:
     """Finestra principale dell'applicazione"""
     
@@ -44,19 +226,35 @@ class MainWindow:
         
         # Managers
         self.project_manager = ProjectManager()
-        self.image_registration = ImageRegistration()
-        self.dual_image_registration = DualImageRegistration()
+        self.dual_image_registration = None  # Creato al primo utilizzo (_get_dual)
+        self._overlay_buf = None  # Buffer overlay riutilizzato tra registrazioni dual
+        self._dual_executor = None  # Processo dedicato alla dual registration (_get_dual_executor)
         
         # Stato applicazione
         self.current_project_path = None
-        self.processing_active = False
+        self.processing_active = False  # Elaborazione in corso (solo thread GUI)
+        
+        # Richiesta di stop: thread di elaborazione ed eventuali processi worker
+        self._stop_event = threading.Event()
+        self._worker_cancel_event = None
+        self._executor = None  # Pool dei worker multispettrali durante l'elaborazione
         
         # Logger del progetto
         self.project_logger: Optional[ProjectLogger] = None
         
+        # Coda messaggi di log (svuotata periodicamente nel thread GUI)
+        self._log_queue = queue.SimpleQueue()
+        
+        # Ultimo valore di progresso non ancora applicato alla progress bar
+        self._pending_progress = None
+        self._progress_flush_scheduled = False
+        
         self.setup_ui()
         self.setup_menu()
         
+        # Avvia lo svuotamento periodico del log
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._log_pump)
+        
         # Gestione chiusura finestra
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
@@ -87,12 +285,50 @@ class MainWindow:
         
         # === PANNELLO DESTRO ===
         
-        # Visualizzatore immagini
-        self.image_viewer = ImageViewer(right_frame, self.on_visualization_saved)
+        # Visualizzatore immagini: creato al primo utilizzo (_ensure_image_viewer)
+        self.image_viewer = None
+        self._viewer_parent = right_frame
+        self._pending_visualizations_dir = None
+        self._viewer_placeholder = ttk.Label(right_frame, text="Nessuna immagine caricata",
+                                             foreground="gray")
+        self._viewer_placeholder.pack(expand=True)
         
         # Barra di stato
         self.setup_status_bar()
     
+    def _get_dual(self):
+        """Crea DualImageRegistration al primo utilizzo (import OpenCV/scikit-image differito)"""
+        if self.dual_image_registration is None:
+            try:
+                from ..core.dual_image_registration import DualImageRegistration
+            except ImportError:
+                from core.dual_image_registration import DualImageRegistration
+            self.dual_image_registration = DualImageRegistration()
+        return self.dual_image_registration
+    
+    def _get_dual_executor(self):
+        """Crea al primo utilizzo il processo worker della dual registration"""
+        if self._dual_executor is None:
+            self._dual_executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._dual_executor
+    
+    def _ensure_image_viewer(self):
+        """Crea il visualizzatore immagini al primo utilizzo e lo restituisce"""
+        if self.image_viewer is None:
+            try:
+                from .image_viewer import ImageViewer
+            except ImportError:
+                from image_viewer import ImageViewer
+            
+            self._viewer_placeholder.destroy()
+            self.image_viewer = ImageViewer(self._viewer_parent, self.on_visualization_saved)
+            if self._pending_visualizations_dir:
+                self.image_viewer.set_project_visualizations_dir(self._pending_visualizations_dir)
+                self._pending_visualizations_dir = None
+        return self.image_viewer
+    
     def setup_project_info(self, parent):
         """Configura il pannello informazioni progetto"""
         self.project_frame = ttk.LabelFrame(parent, text="Progetto Corrente", padding=10)
@@ -155,6 +391,11 @@ class MainWindow:
         mode_combo.grid(row=2, column=1, sticky="w", padx=(5, 0))
         mode_combo.bind("<<ComboboxSelected>>", self.on_processing_mode_change)
         
+        # Log dettagliato (un messaggio per ogni file)
+        self.verbose = tk.BooleanVar(value=False)
+        ttk.Checkbutton(params_frame, text="Log dettagliato",
+                       variable=self.verbose).grid(row=3, column=0, columnspan=2, sticky="w")
+        
         # Controlli specifici per dual registration (inizialmente nascosti)
         self.dual_controls_frame = ttk.LabelFrame(self.processing_frame, text="Opzioni Dual Registration", padding=5)
         
@@ -176,6 +417,10 @@ class MainWindow:
                                 state="readonly", width=15)
         viz_combo.grid(row=1, column=1, sticky="w", padx=(5, 0))
         
+        # Modalità, titolo e colormap ricalcolati solo quando l'utente cambia modalità
+        self.viz_mode_var.trace_add("write", self._on_viz_mode_changed)
+        self._on_viz_mode_changed()
+        
         # Bottoni elaborazione
         buttons_frame = ttk.Frame(self.processing_frame)
         buttons_frame.pack(fill="x")
@@ -203,7 +448,7 @@ class MainWindow:
         text_frame = ttk.Frame(log_frame)
         text_frame.pack(fill="both", expand=True)
         
-        self.log_text = tk.Text(text_frame, height=8, wrap="word")
+        self.log_text = tk.Text(text_frame, height=8, wrap="word", undo=False, maxundo=0)
         log_scrollbar = ttk.Scrollbar(text_frame, command=self.log_text.yview)
         self.log_text.config(yscrollcommand=log_scrollbar.set)
         
@@ -259,6 +504,14 @@ class MainWindow:
         # Aggiorna modalità elaborazione se necessario
         self.update_processing_mode_for_selection(selection_type)
 
+    def _on_viz_mode_changed(self, *args):
+        """Memorizza modalità di visualizzazione dual, titolo e colormap correnti"""
+        viz_mode = self.viz_mode_var.get()
+        self._viz_mode = viz_mode
+        self._viz_title = f"Dual Registration - {viz_mode.replace('_', ' ').title()}"
+        # thermal_overlay è RGB (colormap ignorata); gli altri modi sono in scala di grigi
+        self._viz_cmap = 'hot' if 'thermal' in viz_mode and viz_mode != 'thermal_overlay' else 'gray'
+    
     def on_processing_mode_change(self, event=None):
         """Gestisce il cambio di modalità elaborazione"""
         mode = self.processing_mode_var.get()
@@ -285,88 +538,95 @@ class MainWindow:
             self.processing_mode_var.set("multispectral")
             self.on_processing_mode_change()
 
-    def _group_selected_files(self, selected_paths):
+    def _iter_selected_groups(self, selected_paths):
         """
-        Raggruppa file selezionati per nome base se hanno struttura IMG_xxxx_n
+        Raggruppa in streaming i file selezionati per nome base se hanno struttura IMG_xxxx_n
+
+        Un gruppo viene restituito appena riceve la quinta banda, così l'elaborazione
+        parte senza attendere l'analisi di tutta la selezione.
 
         Args:
             selected_paths: Lista di path file selezionati
 
-        Returns:
-            Dict con gruppi di immagini {base_name: [file_paths]}
+        Yields:
+            Tuple (nome_gruppo, file_paths): gruppi completi (5 bande ordinate) e file singoli
         """
-        import re
+        # Messaggi per singolo file solo con log dettagliato attivo
+        verbose = self.verbose.get()
 
-        # Pattern per riconoscere IMG_xxxx_n (dove n è 1-5)
-        pattern = r'^(.+)_([1-5])$'
-
-        groups = {}
-        ungrouped = {}
+        groups = defaultdict(list)
+        completed = set()
+        complete_count = 0
+        single_count = 0
 
         for path in selected_paths:
-            filename = os.path.splitext(os.path.basename(path))[0]
+            stem = _splitext_stem(path)
 
             # Verifica se il file ha la struttura IMG_xxxx_n
-            match = re.match(pattern, filename)
-
-            if match:
-                base_name = match.group(1)  # IMG_xxxx parte
-                band_num = int(match.group(2))  # numero banda (1-5)
+            match = _BAND_RE.match(stem)
+            if match is None or match.group(1) in completed:
+                # File non strutturato (o banda oltre un gruppo già completo) - gruppo singolo
+                single_count += 1
+                if verbose:
+                    self.log(f"📄 File singolo: {stem}")
+                yield stem, [path]
+                continue
 
-                if base_name not in groups:
-                    groups[base_name] = []
+            base_name = match.group(1)
+            entry = FileEntry(path, _basename(path), stem, int(match.group(2)), base_name)
+            band_entries = groups[base_name]
+            band_entries.append(entry)
+            if verbose:
+                self.log(f"📷 Banda {entry.band_num} aggiunta al gruppo {base_name}")
 
-                groups[base_name].append(path)
-                self.log(f"📷 Banda {band_num} aggiunta al gruppo {base_name}")
-            else:
-                # File non strutturato - tratta come gruppo singolo
-                ungrouped[filename] = [path]
-                self.log(f"📄 File singolo: {filename}")
-
-        # Verifica che i gruppi abbiano tutte le 5 bande
-        valid_groups = {}
-        for base_name, file_paths in groups.items():
-            if len(file_paths) == 5:
-                # Ordina i file per numero banda
-                sorted_paths = self._sort_band_files(file_paths)
-                valid_groups[base_name] = sorted_paths
-                self.log(f"✅ Gruppo completo: {base_name} (5 bande)")
-            else:
-                self.log(f"⚠️ Gruppo incompleto: {base_name} ({len(file_paths)} bande)")
-                # Tratta file incompleti come singoli
-                for path in file_paths:
-                    filename = os.path.splitext(os.path.basename(path))[0]
-                    ungrouped[filename] = [path]
+            if len(band_entries) == 5:
+                # Gruppo completo: ordina i file per numero banda e lo rilascia subito
+                del groups[base_name]
+                completed.add(base_name)
+                complete_count += 1
+                if verbose:
+                    self.log(f"✅ Gruppo completo: {base_name} (5 bande)")
+                yield base_name, self._sort_band_files(band_entries)
 
-        # Combina gruppi validi e file singoli
-        all_groups = {**valid_groups, **ungrouped}
+        # Gruppi rimasti incompleti: tratta i file come singoli
+        for base_name, band_entries in groups.items():
+            if verbose:
+                self.log(f"⚠️ Gruppo incompleto: {base_name} ({len(band_entries)} bande)")
+            for entry in band_entries:
+                single_count += 1
+                yield entry.stem, [entry.path]
 
-        return all_groups
+        # Riepilogo unico (sempre visibile)
+        self.log(f"📁 {complete_count * 5} bande raggruppate in {complete_count} gruppi completi, "
+                 f"{len(groups)} incompleti, {single_count} file singoli")
 
-    def _sort_band_files(self, file_paths):
+    def _sort_band_files(self, band_entries):
         """
         Ordina i file delle bande per numero (1,2,3,4,5)
 
         Args:
-            file_paths: Lista di path file da ordinare
+            band_entries: Lista di FileEntry dello stesso gruppo
 
         Returns:
-            Lista ordinata per numero banda
+            Lista di path ordinata per numero banda
         """
-        import re
-
-        def get_band_number(path):
-            filename = os.path.splitext(os.path.basename(path))[0]
-            match = re.search(r'_([1-5])$', filename)
-            return int(match.group(1)) if match else 0
-
-        return sorted(file_paths, key=get_band_number)
+        return [entry.path for entry in sorted(band_entries, key=attrgetter("band_num"))]
 
     def load_first_image_in_viewer(self, selected_paths, selection_type):
         """Carica la prima immagine disponibile nel visualizzatore"""
         if not selected_paths:
             return
 
+        # Scansione cartella e verifica esistenza fuori dal thread GUI
+        thread = threading.Thread(
+            target=self._find_first_image_thread,
+            args=(list(selected_paths), selection_type)
+        )
+        thread.daemon = True
+        thread.start()
+
+    def _find_first_image_thread(self, selected_paths, selection_type):
+        """Individua in background la prima immagine da visualizzare"""
         try:
             first_image_path = None
 
@@ -375,17 +635,23 @@ class MainWindow:
             elif selection_type == "multiple_files":
                 first_image_path = selected_paths[0]
             elif selection_type == "folder":
-                # Trova il primo file TIFF nella cartella
-                tiff_files = self.file_selector._find_tiff_files(selected_paths[0])
-                if tiff_files:
-                    first_image_path = tiff_files[0]
+                # Trova il primo file TIFF nella cartella (senza elencarli tutti)
+                first_image_path = self.file_selector._find_first_tiff(selected_paths[0])
 
             if first_image_path and os.path.exists(first_image_path):
-                success = self.image_viewer.load_image(first_image_path)
-                if success:
-                    self.log(f"📷 Immagine caricata: {os.path.basename(first_image_path)}")
-                else:
-                    self.log(f"❌ Impossibile caricare: {os.path.basename(first_image_path)}")
+                self._ui(self._load_image_in_viewer, first_image_path)
+
+        except Exception as e:
+            self.log(f"❌ Errore caricamento immagine: {e}")
+
+    def _load_image_in_viewer(self, image_path):
+        """Carica un'immagine nel visualizzatore (thread GUI)"""
+        try:
+            success = self._ensure_image_viewer().load_image(image_path)
+            if success:
+                self.log(f"📷 Immagine caricata: {_basename(image_path)}")
+            else:
+                self.log(f"❌ Impossibile caricare: {_basename(image_path)}")
 
         except Exception as e:
             self.log(f"❌ Errore caricamento immagine: {e}")
@@ -402,20 +668,26 @@ class MainWindow:
         
         # Crea progetto
         try:
-            project_path = self.project_manager.create_project(project_name, selected_paths)
+            # Per un singolo path il tipo è già noto dalla selezione (evita un nuovo stat)
+            source_type = selection_type if selection_type in ("single_file", "folder") else None
+            project_path = self.project_manager.create_project(project_name, selected_paths,
+                                                               source_type)
             self.current_project_path = project_path
 
             # Imposta cartella visualizzazioni nel visualizzatore
             project_paths = self.project_manager.get_project_paths()
             if "visualizations" in project_paths:
-                self.image_viewer.set_project_visualizations_dir(project_paths["visualizations"])
+                if self.image_viewer is not None:
+                    self.image_viewer.set_project_visualizations_dir(project_paths["visualizations"])
+                else:
+                    self._pending_visualizations_dir = project_paths["visualizations"]
 
             # Inizializza logger del progetto
             self._initialize_project_logger()
 
             # Aggiorna UI
             self.update_project_info()
-            self.log(f"✅ Progetto creato: {os.path.basename(project_path)}")
+            self.log(f"✅ Progetto creato: {_basename(project_path)}")
 
         except Exception as e:
             error_msg = f"Impossibile creare progetto: {e}"
@@ -437,7 +709,7 @@ class MainWindow:
             self.project_status_label.config(text="Nessun progetto")
             return
         
-        project_name = os.path.basename(self.current_project_path)
+        project_name = _basename(self.current_project_path)
         source_info = self.project_manager.get_source_info()
         
         info_text = f"Cartella: {project_name}\n"
@@ -459,7 +731,7 @@ class MainWindow:
                 # Log informazioni del progetto
                 selected_paths, selection_type = self.file_selector.get_selection()
                 self.project_logger.log_operation_start("CREAZIONE_PROGETTO", {
-                    "nome_progetto": os.path.basename(self.current_project_path) if self.current_project_path else "N/A",
+                    "nome_progetto": _basename(self.current_project_path) if self.current_project_path else "N/A",
                     "tipo_selezione": selection_type,
                     "numero_file": len(selected_paths) if selected_paths else 0,
                     "modalita_elaborazione": self.processing_mode_var.get()
@@ -484,9 +756,20 @@ class MainWindow:
             return
         
         try:
-            os.startfile(self.current_project_path)  # Windows
-        except AttributeError:
-            os.system(f"xdg-open '{self.current_project_path}'")  # Linux
+            if sys.platform == "win32":
+                os.startfile(self.current_project_path)  # Windows
+            elif sys.platform == "darwin":
+                subprocess.Popen(["open", self.current_project_path])  # macOS
+            else:
+                # Linux: processo separato, senza shell e senza attendere xdg-open
+                subprocess.Popen(
+                    ["xdg-open", self.current_project_path],
+                    start_new_session=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+        except OSError as e:
+            self.log(f"❌ Impossibile aprire la cartella: {e}", "ERROR")
     
     def start_processing(self):
         """Avvia l'elaborazione delle immagini"""
@@ -500,6 +783,7 @@ class MainWindow:
         
         # Avvia elaborazione in thread separato
         self.processing_active = True
+        self._stop_event.clear()
         self.process_button.config(state="disabled")
         self.stop_button.config(state="normal")
         
@@ -511,6 +795,7 @@ class MainWindow:
         """Thread per elaborazione immagini"""
         try:
             self.log("🚀 Avvio elaborazione...")
+            self._set_progress(0)
             
             # Ottieni file da elaborare
             selected_paths, selection_type = self.file_selector.get_selection()
@@ -523,64 +808,149 @@ class MainWindow:
             
             # Modalità multispettrale standard
             if selection_type == "folder":
-                # Trova gruppi di immagini nella cartella
-                image_groups = find_image_groups(selected_paths[0])
+                # Gruppi della cartella in streaming: l'elaborazione parte
+                # dal primo gruppo completo mentre la scansione prosegue
+                image_groups = _iter_folder_groups(selected_paths[0])
             else:
                 # File singoli o multipli - raggruppa per nome base se strutturati
-                image_groups = self._group_selected_files(selected_paths)
-            
-            if not image_groups:
-                self.log("❌ Nessun gruppo di immagini trovato")
-                return
+                image_groups = self._iter_selected_groups(selected_paths)
             
             # Configura registrazione
-            self.image_registration.reference_band = self.ref_band_var.get() - 1
-            self.image_registration.registration_method = self.method_var.get()
+            reference_band = self.ref_band_var.get() - 1
+            registration_method = self.method_var.get()
             
-            # Elabora gruppi
-            total_groups = len(image_groups)
+            # Elabora gruppi in parallelo (un processo per gruppo)
             project_paths = self.project_manager.get_project_paths()
             output_dir = project_paths["registered"]
             
-            for i, (base_name, file_paths) in enumerate(image_groups.items()):
-                if not self.processing_active:
-                    break
+            mp_context = multiprocessing.get_context("spawn")
+            self._worker_cancel_event = mp_context.Event()
+            # Metà dei core logici + 1: i worker sono a thread singolo, evita
+            # di saturare i core fisici condivisi con l'hyperthreading
+            max_workers = (os.cpu_count() or 1) // 2 + 1
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=(reference_band, registration_method, self._worker_cancel_event)
+            )
+            self._executor = executor
+            # Manifest dei gruppi già registrati con gli stessi input e parametri
+            manifest = self.project_manager.load_manifest()
+            
+            # Job (base_name, file_paths, output_file) preparati prima del dispatch;
+            # generatore per non interrompere lo streaming della cartella
+            jobs = (
+                (base_name, file_paths, os.path.join(output_dir, f"{base_name}_registered.tif"))
+                for base_name, file_paths in image_groups
+            )
+            
+            max_pending = max_workers * MAX_PENDING_PER_WORKER
+            pending = {}
+            cached_count = 0
+            submitted_count = 0
+            completed_count = 0  # Gruppi conclusi, riusciti o falliti (progresso)
+            success_count = 0
+            first_loaded = False
+            
+            def collect(done):
+                """Registra l'esito dei gruppi completati e aggiorna il progresso"""
+                nonlocal completed_count, success_count, first_loaded
+                for future in done:
+                    base_name, file_paths, output_file, cache_key = pending.pop(future)
+                    completed_count += 1
+                    
+                    try:
+                        success = future.result()
+                    except Exception as e:
+                        self.log(f"❌ {base_name} fallito: {e}", "ERROR")
+                        success = False
+                    
+                    if success:
+                        # process_image_group restituisce True solo dopo aver scritto l'output
+                        success_count += 1
+                        self.log(f"✅ {base_name} completato")
+                        self.log(f"📁 File salvato: {output_file}")
+                        # Aggiorna metadata progetto e manifest
+                        self.project_manager.add_processed_file(list(file_paths), output_file)
+                        if cache_key is not None:
+                            manifest[cache_key] = {
+                                "output": output_file,
+                                "registered_at": datetime.now().isoformat()
+                            }
+                        
+                        # Carica il primo risultato nel visualizzatore
+                        if not first_loaded:
+                            first_loaded = True
+                            self._prefetch_processed_result(output_file)
+                    else:
+                        self.log(f"❌ {base_name} fallito")
                 
-                self.log(f"📷 Elaborazione {base_name}...")
+                # Aggiorna progress (stima: il totale cresce durante la scansione)
+                total_groups = cached_count + submitted_count
+                self._set_progress((cached_count + completed_count) / total_groups * 100)
+            
+            try:
+                for base_name, file_paths, output_file in jobs:
+                    if self._stop_event.is_set():
+                        break
+                    
+                    try:
+                        cache_key = _group_cache_key(file_paths, registration_method, reference_band)
+                    except OSError as e:
+                        # Banda rimossa o link non valido: il gruppo viene elaborato
+                        # senza cache e l'errore resta confinato al gruppo
+                        self.log(f"⚠️ {base_name}: chiave cache non calcolabile ({e})", "WARNING")
+                        cache_key = None
+                    cached = manifest.get(cache_key) if cache_key is not None else None
+                    if cached and os.path.exists(cached["output"]):
+                        self.log(f"⏭️ {base_name} già registrato (cache)")
+                        cached_count += 1
+                        continue
+                    
+                    self.log(f"📷 Elaborazione {base_name}...")
+                    future = executor.submit(_process_group, file_paths, output_file)
+                    pending[future] = (base_name, file_paths, output_file, cache_key)
+                    submitted_count += 1
+                    
+                    # Finestra di job in volo limitata: si attende un completamento
+                    # prima di leggere altri gruppi
+                    if len(pending) >= max_pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
                 
-                # Aggiorna progress
-                progress = (i / total_groups) * 100
-                self.root.after(0, lambda p=progress: self.progress_var.set(p))
+                if not submitted_count and not cached_count:
+                    self.log("❌ Nessun gruppo di immagini trovato")
+                    return
                 
-                # Crea path output completo
-                output_file = os.path.join(output_dir, f"{base_name}_registered.tif")
-
-                # Elabora gruppo
-                success = self.image_registration.process_image_group(file_paths, output_file)
-
-                if success:
-                    self.log(f"✅ {base_name} completato")
-                    # Verifica che il file sia stato creato
-                    if os.path.exists(output_file):
-                        self.log(f"📁 File salvato: {output_file}")
-                        # Aggiorna metadata progetto
-                        self.project_manager.add_processed_file(str(file_paths), output_file)
-                    else:
-                        self.log(f"⚠️ File non trovato: {output_file}")
-                        success = False
-
-                    # Carica il primo risultato nel visualizzatore
-                    if i == 0:  # Solo per il primo file elaborato
-                        self.root.after(0, lambda: self.load_processed_result(output_file))
-                else:
-                    self.log(f"❌ {base_name} fallito")
+                while pending and not self._stop_event.is_set():
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+            finally:
+                # In caso di stop i gruppi non ancora avviati vengono annullati
+                executor.shutdown(wait=False, cancel_futures=True)
+                try:
+                    # Gruppi già in corso: se arrivano a salvare l'output vengono
+                    # registrati in metadata e manifest (e non rielaborati al prossimo avvio)
+                    if pending:
+                        done, _ = wait(pending)
+                        collect([future for future in done if not future.cancelled()])
+                finally:
+                    self._executor = None
+                    self.project_manager.save_manifest(manifest)
+            
+            if self._stop_event.is_set():
+                # Progresso lasciato al punto raggiunto
+                self.log(f"⏹️ Elaborazione interrotta: {cached_count + success_count} gruppi completati")
+                return
             
             self.log("🎉 Elaborazione completata!")
-            self.root.after(0, lambda: self.progress_var.set(100))
+            self._set_progress(100)
             
         except Exception as e:
             error_msg = f"❌ Errore elaborazione: {e}"
             self.log(error_msg, "ERROR")
+            self._ui(messagebox.showerror, "Errore Elaborazione", f"Errore:\n{e}")
             
             # Log traceback completo se logger disponibile
             if self.project_logger:
@@ -590,11 +960,34 @@ class MainWindow:
                 traceback.print_exc()
         finally:
             # Ripristina UI
-            self.root.after(0, self.processing_finished)
+            self._ui(self.processing_finished)
+    
+    def _ui(self, callback, *args):
+        """Esegue callback nel thread GUI (unico modo sicuro di toccare Tk dai thread di lavoro)"""
+        self.root.after(0, callback, *args)
+    
+    def _set_progress(self, progress):
+        """
+        Registra il progresso corrente; la progress bar viene aggiornata
+        al massimo una volta ogni PROGRESS_FLUSH_INTERVAL_MS
+        """
+        self._pending_progress = progress
+        if not self._progress_flush_scheduled:
+            self._progress_flush_scheduled = True
+            self.root.after(PROGRESS_FLUSH_INTERVAL_MS, self._flush_progress)
+    
+    def _flush_progress(self):
+        """Applica alla progress bar l'ultimo progresso registrato"""
+        self._progress_flush_scheduled = False
+        if self._pending_progress is not None:
+            self.progress_var.set(self._pending_progress)
     
     def stop_processing(self):
         """Ferma l'elaborazione"""
-        self.processing_active = False
+        self._stop_event.set()
+        # Interrompe anche i gruppi in corso nei processi worker
+        if self._worker_cancel_event is not None:
+            self._worker_cancel_event.set()
         self.log("⏹️ Elaborazione interrotta")
     
     def process_dual_registration(self, selected_paths):
@@ -609,27 +1002,32 @@ class MainWindow:
             # Log inizio operazione
             if self.project_logger:
                 self.project_logger.log_operation_start("DUAL_REGISTRATION", {
-                    "immagine_riferimento": os.path.basename(selected_paths[0]),
-                    "immagine_target": os.path.basename(selected_paths[1]),
+                    "immagine_riferimento": _basename(selected_paths[0]),
+                    "immagine_target": _basename(selected_paths[1]),
                     "metodo": self.method_var.get(),
                     "stima_scala": self.scale_estimation_var.get(),
                     "migliora_contrasto": self.enhance_contrast_var.get(),
-                    "modalita_visualizzazione": self.viz_mode_var.get()
+                    "modalita_visualizzazione": self._viz_mode
                 })
             
             # Configura dual registrator
-            self.dual_image_registration.registration_method = self.method_var.get()
-            self.dual_image_registration.scale_factor_estimation = self.scale_estimation_var.get()
-            self.dual_image_registration.enhance_contrast = self.enhance_contrast_var.get()
+            dual = self._get_dual()
+            dual.registration_method = self.method_var.get()
+            dual.scale_factor_estimation = self.scale_estimation_var.get()
+            dual.enhance_contrast = self.enhance_contrast_var.get()
             
             # Imposta progress
-            self.root.after(0, lambda: self.progress_var.set(10))
+            self._ui(self.progress_var.set, 10)
             
-            # Esegui registrazione
-            self.log(f"📷 Registrazione: {os.path.basename(selected_paths[0])} -> {os.path.basename(selected_paths[1])}")
-            result = self.dual_image_registration.register_images(selected_paths[0], selected_paths[1])
+            # Esegui registrazione nel processo worker (fuori dal GIL dell'interfaccia)
+            self.log(f"📷 Registrazione: {_basename(selected_paths[0])} -> {_basename(selected_paths[1])}")
+            future = self._get_dual_executor().submit(
+                _dual_register, selected_paths[0], selected_paths[1],
+                dual.registration_method, dual.scale_factor_estimation, dual.enhance_contrast
+            )
+            result = future.result()
             
-            self.root.after(0, lambda: self.progress_var.set(80))
+            self._ui(self.progress_var.set, 80)
             
             # Salva risultato
             if result:
@@ -637,31 +1035,34 @@ class MainWindow:
                 output_dir = project_paths["registered"]
                 
                 # Crea nome file output
-                ref_name = os.path.splitext(os.path.basename(selected_paths[0]))[0]
-                target_name = os.path.splitext(os.path.basename(selected_paths[1]))[0]
+                ref_name = _splitext_stem(selected_paths[0])
+                target_name = _splitext_stem(selected_paths[1])
                 output_file = os.path.join(output_dir, f"dual_registration_{ref_name}_{target_name}.png")
                 
-                # Crea visualizzazione
-                overlay_image = self.dual_image_registration.create_overlay_visualization(
-                    result, self.viz_mode_var.get()
+                # Crea visualizzazione (riusa il buffer se la risoluzione non cambia)
+                viz_mode = self._viz_mode
+                overlay_image = dual.create_overlay_visualization(
+                    result, viz_mode, out=self._overlay_buf
                 )
+                self._overlay_buf = overlay_image
                 
-                # Salva
-                import matplotlib.pyplot as plt
-                if self.viz_mode_var.get() == 'thermal_overlay':
-                    plt.imsave(output_file, overlay_image)
-                else:
-                    plt.imsave(output_file, overlay_image, cmap='gray')
+                # Salva con PIL (senza matplotlib); compressione PNG adatta alla modalità
+                dual.save_visualization(
+                    overlay_image, output_file,
+                    compress_level=DUAL_PNG_COMPRESS_LEVELS.get(viz_mode, DUAL_PNG_COMPRESS_LEVEL)
+                )
                 
                 # Salva metadati
                 metadata_file = os.path.splitext(output_file)[0] + "_metadata.txt"
-                with open(metadata_file, 'w') as f:
-                    f.write(f"Dual Image Registration Metadata\n")
-                    f.write(f"Reference: {selected_paths[0]}\n")
-                    f.write(f"Target: {selected_paths[1]}\n")
-                    f.write(f"Method: {result['method_used']}\n")
-                    f.write(f"Scale Factor: {result['scale_factor']:.4f}\n")
-                    f.write(f"Visualization: {self.viz_mode_var.get()}\n")
+                payload = (
+                    "Dual Image Registration Metadata\n"
+                    f"Reference: {selected_paths[0]}\n"
+                    f"Target: {selected_paths[1]}\n"
+                    f"Method: {result['method_used']}\n"
+                    f"Scale Factor: {result['scale_factor']:.4f}\n"
+                    f"Visualization: {viz_mode}\n"
+                )
+                Path(metadata_file).write_text(payload)
                 
                 self.log(f"✅ Dual registration completata")
                 self.log(f"📁 Risultato salvato: {output_file}")
@@ -676,10 +1077,10 @@ class MainWindow:
                     })
                 
                 # Carica risultato nel visualizzatore
-                self.root.after(0, lambda: self.load_dual_registration_result(result))
+                self._ui(self.load_dual_registration_result, result)
                 
                 # Aggiorna metadata progetto
-                self.project_manager.add_processed_file(str(selected_paths), output_file)
+                self.project_manager.add_processed_file(list(selected_paths), output_file)
                 
             else:
                 self.log("❌ Dual registration fallita")
@@ -690,11 +1091,12 @@ class MainWindow:
                         "motivo": "Registrazione fallita"
                     })
             
-            self.root.after(0, lambda: self.progress_var.set(100))
+            self._ui(self.progress_var.set, 100)
             
         except Exception as e:
             error_msg = f"❌ Errore dual registration: {e}"
             self.log(error_msg, "ERROR")
+            self._ui(messagebox.showerror, "Errore Dual Registration", f"Errore:\n{e}")
             
             # Log traceback completo se logger disponibile
             if self.project_logger:
@@ -707,22 +1109,13 @@ class MainWindow:
         """Carica risultato dual registration nel visualizzatore"""
         try:
             # Crea visualizzazione overlay per il viewer
-            overlay_image = self.dual_image_registration.create_overlay_visualization(
-                result, self.viz_mode_var.get()
+            overlay_image = self._get_dual().create_overlay_visualization(
+                result, self._viz_mode
             )
             
-            # Determina colormap e titolo
-            viz_mode = self.viz_mode_var.get()
-            if viz_mode == 'thermal_overlay':
-                # Per thermal overlay, usa l'immagine RGB direttamente
-                self.image_viewer.display_array(overlay_image, 
-                                              title=f"Dual Registration - {viz_mode.replace('_', ' ').title()}")
-            else:
-                # Per altri modi, usa colormap gray
-                cmap = 'hot' if 'thermal' in viz_mode else 'gray'
-                self.image_viewer.display_array(overlay_image, 
-                                              title=f"Dual Registration - {viz_mode.replace('_', ' ').title()}", 
-                                              cmap=cmap)
+            # Colormap e titolo precalcolati da _on_viz_mode_changed
+            self._ensure_image_viewer().display_array(overlay_image, title=self._viz_title,
+                                                      cmap=self._viz_cmap)
             
             self.log("🖼️ Risultato caricato nel visualizzatore")
         except Exception as e:
@@ -742,26 +1135,36 @@ class MainWindow:
         self.process_button.config(state="normal")
         self.stop_button.config(state="disabled")
 
-    def load_processed_result(self, output_file):
-        """Carica un risultato elaborato nel visualizzatore"""
+    def _prefetch_processed_result(self, output_file):
+        """Decodifica il risultato nel thread di lavoro e lo mostra nel thread GUI"""
         try:
-            if os.path.exists(output_file):
-                success = self.image_viewer.load_image(output_file)
-                if success:
-                    self.log(f"🖼️ Risultato caricato nel visualizzatore: {os.path.basename(output_file)}")
-                else:
-                    self.log(f"❌ Impossibile visualizzare: {os.path.basename(output_file)}")
+            try:
+                from .image_viewer import read_image_file
+            except ImportError:
+                from image_viewer import read_image_file
+            bands_data = read_image_file(output_file)
         except Exception as e:
             self.log(f"❌ Errore caricamento risultato: {e}")
-
+            return
+        
+        self._ui(self._show_processed_result, output_file, bands_data)
+    
+    def _show_processed_result(self, output_file, bands_data):
+        """Mostra nel visualizzatore un risultato già decodificato"""
+        success = self._ensure_image_viewer().load_image_from_array(bands_data, output_file)
+        if success:
+            self.log(f"🖼️ Risultato caricato nel visualizzatore: {_basename(output_file)}")
+        else:
+            self.log(f"❌ Impossibile visualizzare: {_basename(output_file)}")
+    
     def on_file_double_click(self, file_path):
         """Gestisce doppio click su file per caricarlo nel visualizzatore"""
         try:
-            success = self.image_viewer.load_image(file_path)
+            success = self._ensure_image_viewer().load_image(file_path)
             if success:
-                self.log(f"🖼️ Immagine caricata: {os.path.basename(file_path)}")
+                self.log(f"🖼️ Immagine caricata: {_basename(file_path)}")
             else:
-                self.log(f"❌ Impossibile caricare: {os.path.basename(file_path)}")
+                self.log(f"❌ Impossibile caricare: {_basename(file_path)}")
         except Exception as e:
             self.log(f"❌ Errore caricamento: {e}")
 
@@ -769,7 +1172,7 @@ class MainWindow:
         """Chiamato quando viene salvata una visualizzazione"""
         if self.project_manager.current_project:
             self.project_manager.add_visualization(file_path, visualization_type)
-            self.log(f"💾 Visualizzazione salvata: {os.path.basename(file_path)}")
+            self.log(f"💾 Visualizzazione salvata: {_basename(file_path)}")
     
     def log(self, message, level="INFO"):
         """
@@ -779,10 +1182,8 @@ class MainWindow:
             message: Messaggio da loggare
             level: Livello di log (INFO, WARNING, ERROR)
         """
-        # Log su GUI
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        # Log su GUI: accodato e scritto in blocco da _log_pump
+        self._log_queue.put(message)
         
         # Log su file se disponibile
         if self.project_logger:
@@ -795,6 +1196,26 @@ class MainWindow:
             else:
                 self.project_logger.info(message)
     
+    def _log_pump(self):
+        """Scrive nel widget di log i messaggi accodati con un solo inserimento"""
+        messages = []
+        try:
+            while len(messages) < LOG_FLUSH_MAX_MESSAGES:
+                messages.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if messages:
+            # Chiamate Tcl dirette: evitano il wrapper Python di tk.Text
+            widget = str(self.log_text)
+            tk_call = self.log_text.tk.call
+            tk_call(widget, "insert", "end", "\n".join(messages) + "\n")
+            # Limita le righe del widget per mantenerlo reattivo
+            tk_call(widget, "delete", "1.0", f"end - {LOG_MAX_LINES} lines")
+            tk_call(widget, "see", "end")
+        
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._log_pump)
+    
     def show_about(self):
         """Mostra informazioni sull'applicazione"""
         about_text = """Image Registration v1.0
@@ -817,9 +1238,27 @@ algoritmi SLIC, feature matching e correlazione di fase."""
         # Chiudi logger del progetto
         self._close_project_logger()
         
-        # Pulizia progetto vuoto
+        # Ferma l'elaborazione in corso: i gruppi non avviati vengono annullati
+        # e quelli in volo nei worker si interrompono al prossimo controllo
+        self._stop_event.set()
+        if self._worker_cancel_event is not None:
+            self._worker_cancel_event.set()
+        executor = self._executor
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        # Termina il processo worker della dual registration
+        if self._dual_executor is not None:
+            self._dual_executor.shutdown(wait=False, cancel_futures=True)
+        
+        # Scrive i metadata di progetto in sospeso prima di uscire
+        self.project_manager.flush_metadata(durable=True)
+        
+        # Pulizia progetto vuoto in background: non blocca la chiusura della finestra,
+        # ma il thread non è daemon così l'interprete attende la fine della rimozione
         if self.project_manager.current_project:
-            self.project_manager.cleanup_empty_project()
+            threading.Thread(target=self.project_manager.cleanup_empty_project,
+                             daemon=False).start()
         
         self.root.destroy()
     
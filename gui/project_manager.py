@@ -9,9 +9,39 @@ per l'elaborazione di immagini multispettrali.
 import os
 import json
 import shutil
+import stat
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Ritardo (secondi) con cui le modifiche ai metadata vengono scritte su disco
+METADATA_SAVE_DELAY = 1.0
+
+
+def _write_json(path, data, fsync: bool = False) -> None:
+    """
+    Scrive data come JSON indentato (orjson se disponibile) in un solo write bufferizzato
+
+    Args:
+        path: File di destinazione
+        data: Oggetto da serializzare
+        fsync: Se forzare la scrittura su disco prima di chiudere il file
+    """
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    with open(path, 'wb', buffering=65536) as f:
+        f.write(payload)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
 
 
 class ProjectManager:
@@ -31,18 +61,30 @@ class ProjectManager:
         self.current_project = None
         self.project_metadata = {}
 
+        # Scrittura differita dei metadata (una sola per raffica di modifiche)
+        self._metadata_lock = threading.Lock()
+        self._save_timer = None
+
+        # True quando è noto che il progetto ha contenuto salvato (None: da verificare)
+        self._has_content_cache = None
+
     def create_project(self, project_name: str = None,
-                      source_paths: List[str] = None) -> str:
+                      source_paths: List[str] = None,
+                      source_type: Optional[str] = None) -> str:
         """
         Crea una nuova cartella di progetto
 
         Args:
             project_name: Nome del progetto (auto-generato se None)
             source_paths: Lista di path sorgente (file o cartelle)
+            source_type: Tipo di sorgente già noto al chiamante (rilevato se None)
 
         Returns:
             Path della cartella di progetto creata
         """
+        # Scrive le modifiche in sospeso del progetto precedente
+        self.flush_metadata()
+
         if project_name is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             project_name = f"project_{timestamp}"
@@ -62,17 +104,16 @@ class ProjectManager:
             "project_name": project_name,
             "created_at": datetime.now().isoformat(),
             "source_paths": source_paths or [],
-            "source_type": self._detect_source_type(source_paths),
+            "source_type": source_type or self._detect_source_type(source_paths),
             "processed_files": [],
             "visualizations_saved": []
         }
 
-        metadata_file = project_path / "project_metadata.json"
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        _write_json(project_path / "project_metadata.json", metadata)
 
         self.current_project = str(project_path)
         self.project_metadata = metadata
+        self._has_content_cache = None
 
         return str(project_path)
 
@@ -82,23 +123,33 @@ class ProjectManager:
             return "unknown"
 
         if len(source_paths) == 1:
-            if os.path.isdir(source_paths[0]):
-                return "folder"
-            else:
-                return "single_file"
+            # Un solo stat per distinguere cartella e file
+            try:
+                is_dir = stat.S_ISDIR(os.stat(source_paths[0]).st_mode)
+            except OSError:
+                is_dir = False
+            return "folder" if is_dir else "single_file"
         else:
             return "multiple_files"
 
-    def add_processed_file(self, original_path: str, processed_path: str):
-        """Aggiunge un file processato ai metadata"""
+    def add_processed_file(self, original_path: Union[str, List[str]], processed_path: str):
+        """
+        Aggiunge un file processato ai metadata
+
+        Args:
+            original_path: Path sorgente o lista dei path sorgente (es. bande del gruppo)
+            processed_path: Path del file elaborato
+        """
         if not self.current_project:
             return
 
-        self.project_metadata["processed_files"].append({
-            "original_path": original_path,
-            "processed_path": processed_path,
-            "processed_at": datetime.now().isoformat()
-        })
+        with self._metadata_lock:
+            self.project_metadata["processed_files"].append({
+                "original_path": original_path,
+                "processed_path": processed_path,
+                "processed_at": datetime.now().isoformat()
+            })
+        self._has_content_cache = True
 
         self._save_metadata()
 
@@ -107,22 +158,48 @@ class ProjectManager:
         if not self.current_project:
             return
 
-        self.project_metadata["visualizations_saved"].append({
-            "path": visualization_path,
-            "type": visualization_type,
-            "saved_at": datetime.now().isoformat()
-        })
+        with self._metadata_lock:
+            self.project_metadata["visualizations_saved"].append({
+                "path": visualization_path,
+                "type": visualization_type,
+                "saved_at": datetime.now().isoformat()
+            })
+        self._has_content_cache = True
 
         self._save_metadata()
 
     def _save_metadata(self):
-        """Salva i metadata del progetto corrente"""
+        """Programma il salvataggio dei metadata (al massimo uno ogni METADATA_SAVE_DELAY)"""
         if not self.current_project:
             return
 
-        metadata_file = Path(self.current_project) / "project_metadata.json"
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.project_metadata, f, indent=2, ensure_ascii=False)
+        with self._metadata_lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(METADATA_SAVE_DELAY, self.flush_metadata)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush_metadata(self, durable: bool = False):
+        """
+        Scrive subito su disco i metadata in sospeso del progetto corrente
+
+        Args:
+            durable: Se eseguire fsync prima della sostituzione (chiusura/pulizia)
+        """
+        with self._metadata_lock:
+            if self._save_timer is None:
+                return
+            self._save_timer.cancel()
+            self._save_timer = None
+
+            if not self.current_project:
+                return
+
+            # Scrittura atomica: file temporaneo poi sostituzione
+            metadata_file = Path(self.current_project) / "project_metadata.json"
+            tmp_file = metadata_file.with_name(f".{metadata_file.name}.tmp")
+            _write_json(tmp_file, self.project_metadata, fsync=durable)
+            os.replace(tmp_file, metadata_file)
 
     def get_project_paths(self) -> Dict[str, str]:
         """Restituisce i path delle cartelle del progetto corrente"""
@@ -135,8 +212,29 @@ class ProjectManager:
             "registered": str(project_path / "registered"),
             "visualizations": str(project_path / "visualizations"),
             "exports": str(project_path / "exports"),
-            "logs": str(project_path / "logs")
+            "logs": str(project_path / "logs"),
+            "manifest": str(project_path / "registration_manifest.json")
         }
+
+    def load_manifest(self) -> Dict[str, Dict]:
+        """Carica il manifest dei gruppi già registrati (vuoto se assente)"""
+        if not self.current_project:
+            return {}
+
+        manifest_file = self.get_project_paths()["manifest"]
+        try:
+            with open(manifest_file, 'rb') as f:
+                data = f.read()
+            return orjson.loads(data) if orjson is not None else json.loads(data)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self, manifest: Dict[str, Dict]):
+        """Salva il manifest dei gruppi già registrati"""
+        if not self.current_project:
+            return
+
+        _write_json(self.get_project_paths()["manifest"], manifest)
     
     def get_current_log_file_path(self) -> Optional[str]:
         """Restituisce il percorso del file di log per la sessione corrente"""
@@ -157,13 +255,20 @@ class ProjectManager:
         if not self.current_project:
             return False
 
+        if self._has_content_cache:
+            return True
+
         paths = self.get_project_paths()
 
-        # Controlla se ci sono file nelle cartelle
-        for folder_type in ["registered", "visualizations", "exports"]:
-            folder_path = Path(paths[folder_type])
-            if folder_path.exists() and any(folder_path.iterdir()):
-                return True
+        # Controlla se ci sono file nelle cartelle (si ferma alla prima voce)
+        for folder_type in ("registered", "visualizations", "exports"):
+            try:
+                with os.scandir(paths[folder_type]) as it:
+                    if next(it, None) is not None:
+                        self._has_content_cache = True
+                        return True
+            except FileNotFoundError:
+                continue
 
         return False
 
@@ -172,6 +277,8 @@ class ProjectManager:
         if not self.current_project:
             return
 
+        self.flush_metadata(durable=True)
+
         if not self.has_saved_content():
             try:
                 shutil.rmtree(self.current_project)
@@ -181,6 +288,7 @@ class ProjectManager:
 
         self.current_project = None
         self.project_metadata = {}
+        self._has_content_cache = None
 
     def get_source_info(self) -> Dict:
         """Restituisce informazioni sui file sorgente"""
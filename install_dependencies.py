@@ -4,6 +4,7 @@ Script per installare automaticamente tutte le dipendenze necessarie
 per il modulo image_registration, incluso imagecodecs per file TIFF compressi
 """
 
+import io
 import subprocess
 import sys
 import os
@@ -32,6 +33,20 @@ def install_package(package_name):
         print(f"   {e.stderr}")
         return False
 
+def install_packages(package_names):
+    """Installa più pacchetti con una sola invocazione di pip"""
+    try:
+        print(f"📦 Installazione {', '.join(package_names)}...")
+        result = subprocess.run([
+            sys.executable, "-m", "pip", "install",
+            "--no-input", "--disable-pip-version-check", *package_names
+        ], check=True, capture_output=True, text=True)
+        print("✅ Pacchetti installati")
+        return True
+    except subprocess.CalledProcessError as e:
+        print("⚠️ Installazione combinata fallita, installo i pacchetti singolarmente")
+        return False
+
 def install_from_requirements():
     """Installa da requirements.txt"""
     requirements_file = "requirements.txt"
@@ -87,17 +102,18 @@ def test_imagecodecs_functionality():
         import numpy as np
         import tifffile
         
-        # Test compressione LZW
+        # Test compressione LZW (in memoria, nessun file temporaneo)
         test_data = np.random.randint(0, 1000, (50, 50), dtype=np.uint16)
-        test_file = "test_lzw.tif"
+        buffer = io.BytesIO()
         
         # Salva con LZW
-        tifffile.imwrite(test_file, test_data, compression='lzw')
-        print("✅ File LZW creato")
+        tifffile.imwrite(buffer, test_data, compression='lzw')
+        print("✅ TIFF LZW creato")
         
         # Carica
-        loaded = tifffile.imread(test_file)
-        print("✅ File LZW caricato")
+        buffer.seek(0)
+        loaded = tifffile.imread(buffer)
+        print("✅ TIFF LZW caricato")
         
         # Verifica
         if np.array_equal(test_data, loaded):
@@ -106,10 +122,6 @@ def test_imagecodecs_functionality():
             print("❌ Dati LZW corrotti")
             return False
         
-        # Cleanup
-        os.remove(test_file)
-        print("🗑️ File test rimosso")
-        
         return True
         
     except Exception as e:
@@ -137,7 +149,7 @@ def main():
     except:
         print("⚠️ Aggiornamento pip fallito (continuo comunque)")
     
-    # Installa dipendenze critiche singolarmente
+    # Installa dipendenze critiche
     critical_packages = [
         "numpy",
         "tifffile", 
@@ -152,9 +164,12 @@ def main():
     print("\n📦 Installazione pacchetti critici:")
     failed_packages = []
     
-    for package in critical_packages:
-        if not install_package(package):
-            failed_packages.append(package)
+    # Un solo avvio di pip per tutti i pacchetti; in caso di errore si ripiega
+    # sull'installazione singola per individuare il pacchetto problematico
+    if not install_packages(critical_packages):
+        for package in critical_packages:
+            if not install_package(package):
+                failed_packages.append(package)
     
     # Installa da requirements se esiste
     print("\n📋 Installazione da requirements.txt:")
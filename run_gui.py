@@ -23,59 +23,33 @@ Installazione dipendenze:
 
 import sys
 import os
+import importlib.util
+
+# Dipendenze (nome pacchetto, modulo): verificate con find_spec, senza importarle
+_REQUIRED_DEPENDENCIES = [
+    ("numpy", "numpy"),
+    ("opencv-python", "cv2"),
+    ("scikit-image", "skimage"),
+    ("tifffile", "tifffile"),
+    ("matplotlib", "matplotlib"),
+    ("python3-tk", "_tkinter"),  # estensione C di Tk: "tkinter" esiste anche senza Tk
+]
+
+_OPTIONAL_DEPENDENCIES = [
+    # Critico per file TIFF compressi
+    ("imagecodecs", "imagecodecs - necessario per file TIFF compressi (LZW, DEFLATE)"),
+    # Per metadati geospaziali
+    ("rasterio", "rasterio - necessario per metadati geospaziali"),
+    # Per controllo versioni
+    ("packaging", "packaging - necessario per controllo versioni"),
+]
 
 def check_dependencies():
     """Verifica che tutte le dipendenze siano installate"""
-    missing_deps = []
-    warnings = []
-
-    try:
-        import numpy
-    except ImportError:
-        missing_deps.append("numpy")
-
-    try:
-        import cv2
-    except ImportError:
-        missing_deps.append("opencv-python")
-
-    try:
-        import skimage
-    except ImportError:
-        missing_deps.append("scikit-image")
-
-    try:
-        import tifffile
-    except ImportError:
-        missing_deps.append("tifffile")
-
-    try:
-        import matplotlib
-    except ImportError:
-        missing_deps.append("matplotlib")
-
-    try:
-        import tkinter
-    except ImportError:
-        missing_deps.append("python3-tk")
-
-    # Verifica imagecodecs (critico per file TIFF compressi)
-    try:
-        import imagecodecs
-    except ImportError:
-        warnings.append("imagecodecs - necessario per file TIFF compressi (LZW, DEFLATE)")
-
-    # Verifica rasterio (per metadati geospaziali)
-    try:
-        import rasterio
-    except ImportError:
-        warnings.append("rasterio - necessario per metadati geospaziali")
-
-    # Verifica packaging (per controllo versioni)
-    try:
-        import packaging
-    except ImportError:
-        warnings.append("packaging - necessario per controllo versioni")
+    missing_deps = [package for package, module in _REQUIRED_DEPENDENCIES
+                    if importlib.util.find_spec(module) is None]
+    warnings = [message for module, message in _OPTIONAL_DEPENDENCIES
+                if importlib.util.find_spec(module) is None]
 
     return missing_deps, warnings
 
@@ -10,18 +10,11 @@ Componenti:
 - Funzioni di resume e controllo
 """
 
-from .utils import (
-    find_image_groups,
-    create_output_filename,
-    load_image_band,
-    save_multiband_tiff,
-    validate_image_group,
-    check_already_processed,
-    get_resume_info
-)
+import importlib
 
 __all__ = [
     'find_image_groups',
+    'find_image_groups_iter',
     'create_output_filename', 
     'load_image_band',
     'save_multiband_tiff',
@@ -29,3 +22,17 @@ __all__ = [
     'check_already_processed',
     'get_resume_info'
 ]
+
+# Funzioni importate al primo accesso: numpy, tifffile e rasterio vengono
+# caricati solo quando servono (project_logger resta importabile senza di essi)
+_LAZY_IMPORTS = dict.fromkeys(__all__, '.utils')
+
+
+def __getattr__(name):
+    """Importa i componenti al primo accesso (PEP 562)"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
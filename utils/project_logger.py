@@ -6,14 +6,37 @@ Sistema di logging che salva i log e i traceback dell'ultima esecuzione
 in un file nella cartella del progetto corrente.
 """
 
+import atexit
+import importlib.metadata as importlib_metadata
 import logging
+import logging.handlers
 import os
 import sys
-import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, TextIO
-import threading
+from typing import Optional
+
+# Record trattenuti in memoria prima della scrittura su file (pochi, per non
+# perdere il contesto di un crash; i WARNING e superiori vengono scritti subito)
+LOG_BUFFER_CAPACITY = 32
+
+# Moduli di cui loggare la versione: (etichetta, distribuzioni pip candidate)
+_VERSION_PROBES = (
+    ("NumPy", ("numpy",)),
+    ("OpenCV", ("opencv-python", "opencv-python-headless",
+                "opencv-contrib-python", "opencv-contrib-python-headless")),
+    ("Matplotlib", ("matplotlib",)),
+)
+
+
+def _distribution_version(distributions) -> str:
+    """Restituisce la versione della prima distribuzione installata tra quelle indicate"""
+    for name in distributions:
+        try:
+            return importlib_metadata.version(name)
+        except importlib_metadata.PackageNotFoundError:
+            continue
+    return "non disponibile"
 
 
 class ProjectLogger:
@@ -27,8 +50,8 @@ class ProjectLogger:
             log_file_path: Percorso del file di log (se None, non scrive su file)
         """
         self.log_file_path = log_file_path
-        self.log_file: Optional[TextIO] = None
-        self.lock = threading.Lock()
+        self._file_handler: Optional[logging.FileHandler] = None
+        self._memory_handler: Optional[logging.handlers.MemoryHandler] = None
         
         # Setup logger
         self.logger = logging.getLogger('ProjectLogger')
@@ -61,15 +84,20 @@ class ProjectLogger:
             # Rimuovi file di log precedenti per mantenere solo l'ultimo
             self._cleanup_old_logs()
             
-            # Apri file di log
-            self.log_file = open(self.log_file_path, 'w', encoding='utf-8')
-            
-            # Crea file handler
-            file_handler = logging.FileHandler(self.log_file_path, encoding='utf-8')
+            # Crea file handler (mode 'w': ogni sessione parte da un file nuovo)
+            file_handler = logging.FileHandler(self.log_file_path, mode='w', encoding='utf-8')
             file_handler.setLevel(logging.DEBUG)
             file_handler.setFormatter(self.formatter)
+            self._file_handler = file_handler
             
-            self.logger.addHandler(file_handler)
+            # Buffer in memoria: i record vengono scritti a blocchi, warning ed errori subito
+            memory_handler = logging.handlers.MemoryHandler(
+                capacity=LOG_BUFFER_CAPACITY, flushLevel=logging.WARNING, target=file_handler
+            )
+            atexit.register(memory_handler.flush)
+            self._memory_handler = memory_handler
+            
+            self.logger.addHandler(memory_handler)
             
             self.info(f"Logger inizializzato - File: {self.log_file_path}")
             
@@ -107,25 +135,11 @@ class ProjectLogger:
         self.info(f"Piattaforma: {sys.platform}")
         self.info(f"Working directory: {os.getcwd()}")
         
-        # Informazioni sui moduli critici (versione veloce)
+        # Informazioni sui moduli critici: versione letta dai metadati del pacchetto,
+        # senza importare i moduli (l'import di cv2 costa centinaia di ms)
         modules_info = []
-        try:
-            import numpy
-            modules_info.append(f"NumPy: {numpy.__version__}")
-        except:
-            modules_info.append("NumPy: non disponibile")
-        
-        try:
-            import cv2
-            modules_info.append(f"OpenCV: {cv2.__version__}")
-        except:
-            modules_info.append("OpenCV: non disponibile")
-        
-        try:
-            import matplotlib
-            modules_info.append(f"Matplotlib: {matplotlib.__version__}")
-        except:
-            modules_info.append("Matplotlib: non disponibile")
+        for label, distributions in _VERSION_PROBES:
+            modules_info.append(f"{label}: {_distribution_version(distributions)}")
         
         self.info("Moduli: " + ", ".join(modules_info))
         
@@ -133,50 +147,46 @@ class ProjectLogger:
     
     def debug(self, message: str):
         """Log a livello DEBUG"""
-        with self.lock:
-            self.logger.debug(message)
+        self.logger.debug(message)
     
     def info(self, message: str):
         """Log a livello INFO"""
-        with self.lock:
-            self.logger.info(message)
+        self.logger.info(message)
     
     def warning(self, message: str):
         """Log a livello WARNING"""
-        with self.lock:
-            self.logger.warning(message)
+        self.logger.warning(message)
     
     def error(self, message: str):
         """Log a livello ERROR"""
-        with self.lock:
-            self.logger.error(message)
+        self.logger.error(message)
     
     def critical(self, message: str):
         """Log a livello CRITICAL"""
-        with self.lock:
-            self.logger.critical(message)
+        self.logger.critical(message)
     
     def exception(self, message: str):
         """Log un'eccezione con traceback completo"""
-        with self.lock:
-            self.logger.error(message)
-            self.logger.error("Traceback completo:")
-            self.logger.error(traceback.format_exc())
+        # Traceback formattato solo se il livello ERROR è attivo, in un unico record
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
+        self.logger.error(f"{message}\nTraceback completo:", exc_info=True)
     
     def log_operation_start(self, operation: str, details: dict = None):
         """Logga l'inizio di un'operazione"""
-        self.info(f"INIZIO OPERAZIONE: {operation}")
+        # Un solo record multilinea (i dettagli restano contigui nel file)
+        lines = [f"INIZIO OPERAZIONE: {operation}"]
         if details:
-            for key, value in details.items():
-                self.info(f"  {key}: {value}")
+            lines.extend(f"  {key}: {value}" for key, value in details.items())
+        self.info("\n".join(lines))
     
     def log_operation_end(self, operation: str, success: bool, details: dict = None):
         """Logga la fine di un'operazione"""
         status = "SUCCESSO" if success else "FALLIMENTO"
-        self.info(f"FINE OPERAZIONE: {operation} - {status}")
+        lines = [f"FINE OPERAZIONE: {operation} - {status}"]
         if details:
-            for key, value in details.items():
-                self.info(f"  {key}: {value}")
+            lines.extend(f"  {key}: {value}" for key, value in details.items())
+        self.info("\n".join(lines))
     
     def log_file_operation(self, operation: str, file_path: str, success: bool = True):
         """Logga operazioni su file"""
@@ -185,22 +195,19 @@ class ProjectLogger:
     
     def close(self):
         """Chiude il logger e il file"""
-        with self.lock:
-            self.info("Chiusura logger...")
-            self.info("=" * 60)
-            
-            # Rimuovi tutti gli handler
-            for handler in self.logger.handlers[:]:
-                handler.close()
-                self.logger.removeHandler(handler)
-            
-            # Chiudi file se aperto
-            if self.log_file:
-                try:
-                    self.log_file.close()
-                except:
-                    pass
-                self.log_file = None
+        self.info("Chiusura logger...")
+        self.info("=" * 60)
+        
+        # Rimuovi tutti gli handler (il buffer in memoria viene scritto alla chiusura)
+        if self._memory_handler is not None:
+            atexit.unregister(self._memory_handler.flush)
+            self._memory_handler = None
+        for handler in self.logger.handlers[:]:
+            handler.close()
+            self.logger.removeHandler(handler)
+        if self._file_handler is not None:
+            self._file_handler.close()
+            self._file_handler = None
     
     def __enter__(self):
         """Context manager entry"""
@@ -3,10 +3,9 @@ Utility module for multiband image registration
 """
 
 import os
-import glob
 import re
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Iterator
 import numpy as np
 import tifffile
 from PIL import Image
@@ -29,8 +28,22 @@ except ImportError:
 
                 def save_multiband_with_metadata(self, bands, output_path, reference_metadata,
                                                band_descriptions=None, registration_matrices=None):
-                    multiband_image = np.stack(bands, axis=0)
-                    tifffile.imwrite(output_path, multiband_image, photometric='minisblack')
+                    # Tiled streaming write, one band resident at a time
+                    save_multiband_tiff(bands, output_path)
+
+
+# Extensions matched by the folder patterns in find_image_groups
+_GROUP_EXTENSIONS = ('.tif', '.jpg', '.jpeg', '.JPG', '.JPEG')
+
+# Tile shape of the multiband TIFFs written by save_multiband_tiff
+_TIFF_TILE = (256, 256)
+
+# Registered output file name ("IMG_xxxx_registered.tif")
+_PROCESSED_RE = re.compile(r'(.+)_registered\.tif$')
+
+# Band file name ("IMG_xxxx_n.tif/.jpg/.jpeg", case-insensitive) and its band number
+_BASE_NAME_RE = re.compile(r'(IMG_\d+)_(\d+)\.(?:tif|jpg|jpeg)', re.IGNORECASE)
+_BAND_NUMBER_RE = re.compile(r'_(\d+)\.(tif|jpg|jpeg)$', re.IGNORECASE)
 
 
 def find_image_groups(input_path: str) -> Dict[str, List[str]]:
@@ -49,51 +62,101 @@ def find_image_groups(input_path: str) -> Dict[str, List[str]]:
         filename = os.path.basename(input_path)
         base_name = extract_base_name(filename)
         if base_name:
-            patterns = [
-                os.path.join(base_dir, f"{base_name}_*.tif"),
-                os.path.join(base_dir, f"{base_name}_*.jpg"),
-                os.path.join(base_dir, f"{base_name}_*.jpeg"),
-                os.path.join(base_dir, f"{base_name}_*.JPG"),
-                os.path.join(base_dir, f"{base_name}_*.JPEG")
-            ]
-            files = []
-            for pattern in patterns:
-                files.extend(glob.glob(pattern))
-            files = sorted(files)
+            # One directory pass for all extensions ("{base_name}_*" siblings)
+            prefix = f"{base_name}_"
+            with os.scandir(base_dir or os.curdir) as entries:
+                files = sorted(
+                    os.path.join(base_dir, entry.name) for entry in entries
+                    if entry.name.startswith(prefix) and entry.name.endswith(_GROUP_EXTENSIONS)
+                )
             return {base_name: files}
         return {}
 
     elif os.path.isdir(input_path):
-        # Search for all .tif, .jpg, .jpeg files in the folder
-        patterns = [
-            os.path.join(input_path, "IMG_*_*.tif"),
-            os.path.join(input_path, "IMG_*_*.jpg"),
-            os.path.join(input_path, "IMG_*_*.jpeg"),
-            os.path.join(input_path, "IMG_*_*.JPG"),
-            os.path.join(input_path, "IMG_*_*.JPEG")
-        ]
-        all_files = []
-        for pattern in patterns:
-            all_files.extend(glob.glob(pattern))
-
-        groups = {}
-        for file_path in all_files:
-            filename = os.path.basename(file_path)
-            base_name = extract_base_name(filename)
-            if base_name:
-                if base_name not in groups:
-                    groups[base_name] = []
-                groups[base_name].append(file_path)
-
-        # Sort files in each group
-        for base_name in groups:
-            groups[base_name] = sorted(groups[base_name])
-
-        return groups
+        # Single directory pass over .tif, .jpg, .jpeg files; each file goes
+        # straight into its band slot (1-5), so groups need no sorting
+        slots = {}
+        extras = {}
+        with os.scandir(input_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.startswith('IMG_') and name.endswith(_GROUP_EXTENSIONS)):
+                    continue
+                match = _BASE_NAME_RE.match(name)
+                if not match:
+                    continue
+
+                base_name = match.group(1)
+                band_slots = slots.setdefault(base_name, [None] * 5)
+                band_index = int(match.group(2)) - 1
+                if 0 <= band_index < 5 and band_slots[band_index] is None:
+                    band_slots[band_index] = entry.path
+                else:
+                    # Band number out of range or duplicated: kept so the group fails validation
+                    extras.setdefault(base_name, []).append(entry.path)
+
+        return {
+            base_name: [path for path in band_slots if path is not None] + extras.get(base_name, [])
+            for base_name, band_slots in slots.items()
+        }
     
     return {}
 
 
+def find_image_groups_iter(folder: str, bands_per_group: int = 5) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Stream image groups from a folder as soon as each one is complete
+
+    Files are placed in band slots like find_image_groups. A group is yielded
+    during the scan once slots 1..bands_per_group are all filled and no
+    duplicate or out-of-range band was seen; other groups are yielded at the
+    end with their extra files appended, so they fail validation as with
+    find_image_groups. Each base name is yielded once: band files arriving
+    after their group was yielded are ignored.
+
+    Args:
+        folder: Folder path
+        bands_per_group: Number of bands making a complete group
+
+    Yields:
+        Tuples (base_name, list of file paths ordered by band number)
+    """
+    slots = {}
+    extras = {}
+    yielded = set()
+
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            name = entry.name
+            if not (name.startswith('IMG_') and name.endswith(_GROUP_EXTENSIONS)):
+                continue
+            match = _BASE_NAME_RE.match(name)
+            if not match or not entry.is_file():
+                continue
+
+            base_name = match.group(1)
+            if base_name in yielded:
+                continue
+
+            band_slots = slots.setdefault(base_name, [None] * bands_per_group)
+            band_index = int(match.group(2)) - 1
+            if 0 <= band_index < bands_per_group and band_slots[band_index] is None:
+                band_slots[band_index] = entry.path
+            else:
+                # Band number out of range or duplicated: kept so the group fails validation
+                extras.setdefault(base_name, []).append(entry.path)
+                continue
+
+            if base_name not in extras and None not in band_slots:
+                del slots[base_name]
+                yielded.add(base_name)
+                yield base_name, band_slots
+
+    # Remaining groups (incomplete or with extra files)
+    for base_name, band_slots in slots.items():
+        yield base_name, [path for path in band_slots if path is not None] + extras.get(base_name, [])
+
+
 def extract_base_name(filename: str) -> Optional[str]:
     """
     Extract base name from filename like IMG_xxxx_1.tif
@@ -105,27 +168,21 @@ def extract_base_name(filename: str) -> Optional[str]:
         Base name (e.g. IMG_1234) or None if doesn't match pattern
     """
     # Support multiple extensions: .tif, .jpg, .jpeg (case-insensitive)
-    patterns = [
-        r'(IMG_\d+)_\d+\.tif',
-        r'(IMG_\d+)_\d+\.jpg',
-        r'(IMG_\d+)_\d+\.jpeg',
-        r'(IMG_\d+)_\d+\.JPG',
-        r'(IMG_\d+)_\d+\.JPEG'
-    ]
-    
-    for pattern in patterns:
-        match = re.match(pattern, filename, re.IGNORECASE)
-        if match:
-            return match.group(1)
-    return None
+    match = _BASE_NAME_RE.match(filename)
+    return match.group(1) if match else None
 
 
-def load_image_band(file_path: str) -> np.ndarray:
+def load_image_band(file_path: str, dtype: Optional[np.dtype] = np.float32) -> np.ndarray:
     """
     Load a single band from image file (supports TIFF, JPG, JPEG)
 
+    Uncompressed TIFFs are memory-mapped instead of decoded into a temporary
+    buffer, so the only full copy is the conversion to dtype.
+
     Args:
         file_path: File path
+        dtype: Output dtype (None returns the file's native dtype, possibly
+            as a read-only memory map)
 
     Returns:
         Numpy array of the image
@@ -135,11 +192,21 @@ def load_image_band(file_path: str) -> np.ndarray:
     # Handle TIFF files
     if file_ext in ['.tif', '.tiff']:
         try:
-            # Try with tifffile first for TIFF
-            img = tifffile.imread(file_path)
+            # Try with tifffile first for TIFF (memory-mapped when possible)
+            try:
+                img = tifffile.memmap(file_path, mode='r')
+                mapped = True
+            except ValueError:
+                # Compressed or non-contiguous data: full decode
+                img = tifffile.imread(file_path)
+                mapped = False
             if img.ndim == 3 and img.shape[2] == 1:
                 img = img.squeeze(axis=2)
-            return img.astype(np.float32)
+            if dtype is None:
+                return img
+            # A decoded buffer is already private: convert it without copying when
+            # it has the requested dtype (a memory map is always copied)
+            return img.astype(dtype, copy=mapped)
         except Exception as e:
             # Check for specific compression errors
             if "imagecodecs" in str(e) or "COMPRESSION" in str(e):
@@ -157,10 +224,10 @@ def load_image_band(file_path: str) -> np.ndarray:
         # Convert to grayscale if it's a color image (for consistency with multispectral workflow)
         if img.mode in ['RGB', 'RGBA']:
             img = img.convert('L')
-        img_array = np.array(img).astype(np.float32)
+        img_array = np.asarray(img)
         if img_array.ndim == 3 and img_array.shape[2] == 1:
             img_array = img_array.squeeze(axis=2)
-        return img_array
+        return img_array if dtype is None else img_array.astype(dtype)
     except Exception as e2:
         if file_ext in ['.tif', '.tiff']:
             raise RuntimeError(
@@ -175,6 +242,18 @@ def load_image_band(file_path: str) -> np.ndarray:
             )
 
 
+# Shared MetadataManager (stateless; one instance per process)
+_metadata_manager = None
+
+
+def _get_metadata_manager() -> MetadataManager:
+    """Return the process-wide MetadataManager, creating it on first use"""
+    global _metadata_manager
+    if _metadata_manager is None:
+        _metadata_manager = MetadataManager()
+    return _metadata_manager
+
+
 def load_image_band_with_metadata(file_path: str) -> Tuple[np.ndarray, Dict]:
     """
     Load a single band from TIFF file preserving metadata
@@ -185,8 +264,7 @@ def load_image_band_with_metadata(file_path: str) -> Tuple[np.ndarray, Dict]:
     Returns:
         Tuple (numpy array of image, metadata)
     """
-    metadata_manager = MetadataManager()
-    return metadata_manager.load_image_with_metadata(file_path)
+    return _get_metadata_manager().load_image_with_metadata(file_path)
 
 
 def save_multiband_tiff(bands: List[np.ndarray], output_path: str) -> None:
@@ -197,11 +275,47 @@ def save_multiband_tiff(bands: List[np.ndarray], output_path: str) -> None:
         bands: List of numpy arrays representing bands
         output_path: Output file path
     """
-    # Stack bands along axis 0 (first axis)
-    multiband_image = np.stack(bands, axis=0)
+    dtype = np.result_type(*bands)
+    shape = (len(bands),) + bands[0].shape
+
+    # Stream tiles band by band (no stacked copy); one page with a plane per band
+    with tifffile.TiffWriter(output_path, bigtiff=True) as tif:
+        tif.write(
+            _iter_band_tiles(bands, _TIFF_TILE, dtype),
+            shape=shape,
+            dtype=dtype,
+            photometric='minisblack',
+            planarconfig='separate',
+            tile=_TIFF_TILE,
+            compression='zlib',
+            predictor=np.issubdtype(dtype, np.integer)
+        )
+
+
+def _iter_band_tiles(bands: List[np.ndarray], tile: Tuple[int, int],
+                     dtype: np.dtype) -> Iterator[np.ndarray]:
+    """
+    Yield the tiles of each band in TIFF order, zero-padding edge tiles
 
-    # Save using tifffile
-    tifffile.imwrite(output_path, multiband_image, photometric='minisblack')
+    Args:
+        bands: List of 2D band arrays
+        tile: Tile shape (rows, columns)
+        dtype: Output dtype
+
+    Yields:
+        Arrays of shape tile
+    """
+    tile_h, tile_w = tile
+    for band in bands:
+        height, width = band.shape
+        for y in range(0, height, tile_h):
+            for x in range(0, width, tile_w):
+                block = band[y:y + tile_h, x:x + tile_w]
+                if block.shape != tile:
+                    padded = np.zeros(tile, dtype=dtype)
+                    padded[:block.shape[0], :block.shape[1]] = block
+                    block = padded
+                yield np.ascontiguousarray(block, dtype=dtype)
 
 
 def save_multiband_tiff_with_metadata(bands: List[np.ndarray],
@@ -219,8 +333,7 @@ def save_multiband_tiff_with_metadata(bands: List[np.ndarray],
         band_descriptions: Descriptions for each band
         registration_matrices: Applied registration matrices
     """
-    metadata_manager = MetadataManager()
-    metadata_manager.save_multiband_with_metadata(
+    _get_metadata_manager().save_multiband_with_metadata(
         bands, output_path, reference_metadata,
         band_descriptions, registration_matrices
     )
@@ -239,21 +352,22 @@ def validate_image_group(file_paths: List[str]) -> bool:
     if len(file_paths) != 5:
         return False
 
-    # Verify that all files exist
+    # Verify that band numbers are 1,2,3,4,5 (one bit per band, checked
+    # before touching the filesystem)
+    band_mask = 0
     for path in file_paths:
-        if not os.path.exists(path):
+        match = _BAND_NUMBER_RE.search(os.path.basename(path))
+        if not match:
             return False
+        band = int(match.group(1))
+        if not 1 <= band <= 5:
+            return False
+        band_mask |= 1 << band
+    if band_mask != 0b111110:
+        return False
 
-    # Verify that band numbers are 1,2,3,4,5
-    band_numbers = []
-    for path in file_paths:
-        filename = os.path.basename(path)
-        match = re.search(r'_(\d+)\.(tif|jpg|jpeg)$', filename, re.IGNORECASE)
-        if match:
-            band_numbers.append(int(match.group(1)))
-
-    expected_bands = {1, 2, 3, 4, 5}
-    return set(band_numbers) == expected_bands
+    # Verify that all files exist
+    return all(os.path.exists(path) for path in file_paths)
 
 
 def create_output_filename(base_name: str, output_dir: str) -> str:
@@ -296,19 +410,16 @@ def find_processed_groups(output_dir: str) -> set:
     Returns:
         Set of base names already processed
     """
-    if not os.path.exists(output_dir):
-        return set()
-
     processed = set()
-    pattern = os.path.join(output_dir, "*_registered.tif")
-
-    for file_path in glob.glob(pattern):
-        filename = os.path.basename(file_path)
-        # Extract base name from "IMG_xxxx_registered.tif"
-        match = re.match(r'(.+)_registered\.tif$', filename)
-        if match:
-            base_name = match.group(1)
-            processed.add(base_name)
+    try:
+        with os.scandir(output_dir) as entries:
+            for entry in entries:
+                # Extract base name from "IMG_xxxx_registered.tif"
+                match = _PROCESSED_RE.match(entry.name)
+                if match and entry.is_file(follow_symlinks=False):
+                    processed.add(match.group(1))
+    except FileNotFoundError:
+        pass
 
     return processed
 